@@ -0,0 +1,63 @@
+# benchmarks/bench_render.py
+# 레이어 렌더링 방식 비교: 도형별 그리기 vs 레이어 단위 일괄 그리기 (오프스크린 QImage)
+# 실행: python -m benchmarks.bench_render --shapes 200000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtCore import Qt
+from models.geometry_store import GeometryStore, KIND_LINE, KIND_CIRCLE, KIND_RECTANGLE, COORD_COLUMNS
+from ui.layer_renderer import draw_rows_per_shape, draw_rows_batched
+
+def make_layer(count, extent, seed=0):
+    rng = np.random.default_rng(seed)
+    kinds = rng.choice([KIND_LINE, KIND_CIRCLE, KIND_RECTANGLE], size=count, p=[0.8, 0.1, 0.1])
+    start = rng.uniform(0, extent, size=(count, 2))
+    end = start + rng.uniform(-extent / 100, extent / 100, size=(count, 2))
+    coords = np.hstack((start, end, np.zeros((count, COORD_COLUMNS - 4))))
+    circles = kinds == KIND_CIRCLE
+    coords[circles, 2] = np.abs(coords[circles, 2] - coords[circles, 0])
+    coords[circles, 3] = 0.0
+    store = GeometryStore('bench')
+    store.extend(kinds, coords)
+    return {'color': Qt.black, 'shapes': store, 'hatch': Qt.NoBrush}
+
+def render(draw, layer, size, scale, repeat):
+    rows = np.arange(len(layer['shapes']))
+    image = QImage(size, size, QImage.Format_ARGB32_Premultiplied)
+    timings = []
+    for _ in range(repeat):
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        painter.scale(scale, scale)
+        start = time.perf_counter()
+        draw(painter, layer, rows, scale)
+        painter.end()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='레이어 렌더링 방식 비교')
+    parser.add_argument('--shapes', type=int, default=100000)
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    extent = 10000.0
+    scale = args.size / extent
+    layer = make_layer(args.shapes, extent)
+    per_shape = render(draw_rows_per_shape, layer, args.size, scale, args.repeat)
+    batched = render(draw_rows_batched, layer, args.size, scale, args.repeat)
+    print(f'shapes: {args.shapes}  image: {args.size}x{args.size}')
+    print(f'per-shape: {per_shape * 1000:.1f} ms')
+    print(f'batched:   {batched * 1000:.1f} ms  ({per_shape / batched:.1f}x)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# models/blocks.py
+# 블록 정의는 한 번만 보관하고 INSERT 는 블록 번호와 변환값만 가진 가벼운 참조로 보관
+
+import numpy as np
+from models.geometry_store import GeometryStore
+
+MAX_BLOCK_DEPTH = 16  # 중첩 블록 참조 최대 깊이 (순환 참조 방지)
+
+def transform_points(xs, ys, transforms):
+    # 블록 좌표(기준점 기준) 점들을 INSERT 변환 (x, y, x 배율, y 배율, 회전각) 으로 옮김
+    # xs, ys: (N, K), transforms: (N, 5)
+    x, y, sx, sy, rotation = [transforms[:, i:i + 1] for i in range(5)]
+    radians = np.radians(rotation)
+    cos, sin = np.cos(radians), np.sin(radians)
+    xs = xs * sx
+    ys = ys * sy
+    return x + xs * cos - ys * sin, y + xs * sin + ys * cos
+
+class InsertStore:
+    # 블록 참조를 열 단위 배열로 보관
+    # block_ids: names 목록의 번호, transforms: (x, y, x 배율, y 배율, 회전각)
+    def __init__(self, capacity=64):
+        self.names = []
+        self.ids = {}
+        self.block_ids = np.empty(capacity, dtype=np.int32)
+        self.transforms = np.empty((capacity, 5), dtype=np.float64)
+        self.count = 0
+        self.version = 0
+
+    def __len__(self):
+        return self.count
+
+    def block_id(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def block_name(self, row):
+        return self.names[int(self.block_ids[row])]
+
+    def reserve(self, size):
+        capacity = len(self.block_ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        block_ids = np.empty(capacity, dtype=np.int32)
+        block_ids[:self.count] = self.block_ids[:self.count]
+        transforms = np.empty((capacity, 5), dtype=np.float64)
+        transforms[:self.count] = self.transforms[:self.count]
+        self.block_ids = block_ids
+        self.transforms = transforms
+
+    def append(self, name, transform):
+        row = self.count
+        self.reserve(row + 1)
+        self.block_ids[row] = self.block_id(name)
+        self.transforms[row] = transform
+        self.count += 1
+        self.version += 1
+        return row
+
+    def extend(self, names, transforms):
+        # 블록 이름 목록과 변환 배열 묶음을 추가하고 추가된 행 번호 범위를 반환
+        transforms = np.asarray(transforms, dtype=np.float64).reshape(-1, 5)
+        start = self.count
+        end = start + len(transforms)
+        self.reserve(end)
+        self.block_ids[start:end] = [self.block_id(name) for name in names]
+        self.transforms[start:end] = transforms
+        self.count = end
+        self.version += 1
+        return np.arange(start, end)
+
+    def copy(self):
+        inserts = InsertStore(max(self.count, 1))
+        inserts.extend([self.block_name(row) for row in range(self.count)], self.transforms[:self.count])
+        return inserts
+
+    def clear(self):
+        self.count = 0
+        self.version += 1
+
+    def bounds(self, blocks, rows=None, depth=0):
+        # 블록 범위의 네 모서리를 각 참조의 변환으로 옮겨 행별 경계 상자 (N, 4) 계산
+        rows = np.arange(self.count) if rows is None else np.asarray(rows)
+        transforms = self.transforms[rows]
+        bounds = np.column_stack((transforms[:, 0], transforms[:, 1], transforms[:, 0], transforms[:, 1]))
+        block_ids = self.block_ids[rows]
+        for block_id in np.unique(block_ids).tolist():
+            block = blocks.get(self.names[block_id])
+            extent = block.extent(blocks, depth + 1) if block is not None else None
+            if extent is None:
+                continue
+            same = block_ids == block_id
+            min_x, min_y, max_x, max_y = extent
+            base_x, base_y = block.base
+            xs = np.array([[min_x, max_x, max_x, min_x]]) - base_x
+            ys = np.array([[min_y, min_y, max_y, max_y]]) - base_y
+            xs, ys = transform_points(np.repeat(xs, same.sum(), axis=0), np.repeat(ys, same.sum(), axis=0),
+                                      transforms[same])
+            bounds[same] = np.column_stack((xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)))
+        return bounds
+
+    def add_to_dxf(self, layout, layer_name, start=0, stop=None):
+        stop = self.count if stop is None else stop
+        for row in range(start, stop):
+            x, y, sx, sy, rotation = self.transforms[row].tolist()
+            layout.add_blockref(self.block_name(row), (x, y, 0), dxfattribs={
+                'layer': layer_name, 'xscale': sx, 'yscale': sy, 'rotation': rotation})
+
+class Block:
+    # 블록 정의: 기준점과 블록 좌표계의 도형/중첩 참조
+    def __init__(self, name, base=(0.0, 0.0)):
+        self.name = name
+        self.base = base
+        self.shapes = GeometryStore(name)
+        self.inserts = InsertStore()
+        self.paths = None  # 렌더러가 만든 (버전, 선/호 경로, 채움 경로) 캐시
+        self._extent = None
+        self._extent_key = None
+
+    def extent(self, blocks, depth=0):
+        # 블록 좌표계 기준 범위, 도형이 없으면 None (도형/참조가 바뀔 때까지 캐시)
+        if depth > MAX_BLOCK_DEPTH:
+            return None
+        key = (self.shapes.version, self.inserts.version)
+        if self._extent_key == key:
+            return self._extent
+        parts = []
+        if len(self.shapes):
+            parts.append(self.shapes.extent())
+        if len(self.inserts):
+            bounds = self.inserts.bounds(blocks, depth=depth)
+            parts.append((bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max()))
+        extent = None
+        if parts:
+            parts = np.array(parts, dtype=np.float64)
+            extent = tuple(np.concatenate((parts[:, :2].min(axis=0), parts[:, 2:].max(axis=0))).tolist())
+        self._extent = extent
+        self._extent_key = key
+        return extent
@@ -0,0 +1,115 @@
+# models/cadastral_cache.py
+# 연속지적도를 대상 좌표계로 한 번 변환해 공간 순서(힐베르트 곡선)로 정렬한 GeoParquet 로 저장해 두고
+# 이후에는 구획선 범위에 걸치는 행 묶음만 읽음
+
+import os
+import shutil
+import hashlib
+from pathlib import Path
+import numpy as np
+import geopandas as gpd
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pyproj import CRS
+from models.geometry_cache import content_hash, read_meta, write_meta
+
+CACHE_VERSION = 1  # 저장 형식이 바뀌면 올림
+CACHE_DIR = os.environ.get('PYCADMAN_CADASTRAL_CACHE_DIR',
+                           os.path.join(os.path.expanduser('~'), '.cache', 'pycadman', 'cadastral'))
+ROW_GROUP_SIZE = 20000  # 범위 검사로 건너뛸 수 있는 읽기 단위
+BBOX_COLUMN = 'bbox'  # GeoParquet 1.1 범위 열 (to_parquet(write_covering_bbox=True) 의 기본 이름)
+ORDER_COLUMN = '__source_order'  # 원본 파일의 행 순서
+SIDECAR_SUFFIXES = ('.shp', '.shx', '.dbf', '.prj', '.cpg')
+
+def source_files(filename):
+    # Shapefile 은 같은 이름의 부속 파일도 내용에 포함
+    path = Path(filename)
+    if path.suffix.lower() != '.shp':
+        return [str(path)]
+    return [str(path.with_suffix(suffix)) for suffix in SIDECAR_SUFFIXES if path.with_suffix(suffix).exists()]
+
+def crs_text(crs):
+    return CRS.from_user_input(crs).to_wkt()
+
+def entry_dir(filename, crs, encoding):
+    # 원본 경로, 대상 좌표계, 인코딩마다 항목 하나
+    key = '\n'.join((os.path.abspath(filename), crs_text(crs), encoding))
+    return os.path.join(CACHE_DIR, hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest())
+
+def file_key(filename):
+    files = source_files(filename)
+    stats = [os.stat(name) for name in files]
+    return {'version': CACHE_VERSION, 'path': os.path.abspath(filename),
+            'sizes': [stat.st_size for stat in stats], 'mtimes_ns': [stat.st_mtime_ns for stat in stats]}
+
+def source_hash(filename):
+    return ':'.join(content_hash(name) for name in source_files(filename))
+
+def invalidate(filename, crs, encoding='utf-8'):
+    shutil.rmtree(entry_dir(filename, crs, encoding), ignore_errors=True)
+
+def valid_entry(filename, crs, encoding):
+    # 유효한 항목의 parquet 경로, 없거나 원본이 바뀌었으면 None
+    directory = entry_dir(filename, crs, encoding)
+    meta = read_meta(directory)
+    if meta is None:
+        return None
+    key = file_key(filename)
+    if meta.get('version') != CACHE_VERSION or meta.get('path') != key['path'] or meta.get('sizes') != key['sizes']:
+        invalidate(filename, crs, encoding)
+        return None
+    if meta.get('mtimes_ns') != key['mtimes_ns']:
+        # 수정 시각만 바뀐 경우 내용 해시가 같으면 계속 사용
+        if meta.get('hash') != source_hash(filename):
+            invalidate(filename, crs, encoding)
+            return None
+        meta['mtimes_ns'] = key['mtimes_ns']
+        write_meta(directory, meta)
+    return os.path.join(directory, 'parcels.parquet')
+
+def spatial_order(geometry):
+    # 범위 중심의 힐베르트 곡선 순서 (빈 도형은 맨 뒤)
+    distances = np.full(len(geometry), np.iinfo(np.int64).max, dtype=np.int64)
+    filled = ~(geometry.isna() | geometry.is_empty).to_numpy()
+    if filled.any():
+        distances[filled] = geometry[filled].hilbert_distance().to_numpy()
+    return np.argsort(distances, kind='stable')
+
+def build(filename, crs, encoding='utf-8'):
+    # 원본 전체를 읽어 변환하고 공간 순서로 정렬해 저장, parquet 경로 반환
+    key = file_key(filename)
+    key['hash'] = source_hash(filename)
+    key['crs'] = crs_text(crs)
+    key['encoding'] = encoding
+    directory = entry_dir(filename, crs, encoding)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    gdf = gpd.read_file(filename, encoding=encoding).to_crs(crs)
+    gdf[ORDER_COLUMN] = np.arange(len(gdf))
+    gdf = gdf.iloc[spatial_order(gdf.geometry)]
+    path = os.path.join(directory, 'parcels.parquet')
+    gdf.to_parquet(path, index=False, write_covering_bbox=True, row_group_size=ROW_GROUP_SIZE)
+    # 메타데이터를 마지막에 써서 다 저장된 항목만 유효하게 취급
+    write_meta(directory, key)
+    return path
+
+def extents_filter(extents):
+    # 범위 상자 (N, 4) 중 하나라도 겹치는 행만 남기는 조건 (행 묶음 통계로 겹치지 않는 묶음은 읽지 않음)
+    condition = pc.scalar(False)
+    for min_x, min_y, max_x, max_y in np.asarray(extents, dtype=np.float64).tolist():
+        overlaps = ((pc.field((BBOX_COLUMN, 'xmin')) <= max_x) & (pc.field((BBOX_COLUMN, 'xmax')) >= min_x) &
+                    (pc.field((BBOX_COLUMN, 'ymin')) <= max_y) & (pc.field((BBOX_COLUMN, 'ymax')) >= min_y))
+        condition = condition | overlaps
+    return condition
+
+def load(filename, crs, extents=None, encoding='utf-8'):
+    # 대상 좌표계로 변환된 연속지적도를 원본 행 순서로 반환, extents (N, 4) 를 주면 그 범위에 걸치는 필지만 읽음
+    # 캐시가 없거나 원본이 바뀌었으면 먼저 만듦
+    path = valid_entry(filename, crs, encoding) or build(filename, crs, encoding)
+    columns = [name for name in pq.read_schema(path).names if name != BBOX_COLUMN]
+    if extents is not None:
+        gdf = gpd.read_parquet(path, columns=columns, filters=extents_filter(extents))
+    else:
+        gdf = gpd.read_parquet(path, columns=columns)
+    order = np.argsort(gdf[ORDER_COLUMN].to_numpy(), kind='stable')
+    return gdf.iloc[order].drop(columns=ORDER_COLUMN).reset_index(drop=True)
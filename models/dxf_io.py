@@ -0,0 +1,218 @@
+# models/dxf_io.py
+
+import os
+import tempfile
+import numpy as np
+import ezdxf
+from ezdxf.addons import iterdxf
+from models.geometry_store import KIND_LINE, KIND_CIRCLE, KIND_RECTANGLE, KIND_ARC, COORD_COLUMNS
+from models.blocks import Block
+
+CHUNK_SIZE = 50000  # 한 번에 캔버스로 넘길 엔티티 수
+
+def rectangle_row(entity):
+    # 닫힌 4점 축 정렬 LWPOLYLINE (저장 시 사각형 형식) 은 사각형 행으로 되돌림
+    if entity.dxftype() != 'LWPOLYLINE' or not entity.closed:
+        return None
+    points = [(x, y, bulge) for x, y, bulge in entity.get_points('xyb')]
+    if len(points) == 5 and points[0][:2] == points[4][:2]:
+        points = points[:4]
+    if len(points) != 4 or any(bulge for _, _, bulge in points):
+        return None
+    (x1, y1, _), (x2, y2, _), (x3, y3, _), (x4, y4, _) = points
+    vertical_first = x1 == x2 and y2 == y3 and x3 == x4 and y4 == y1
+    horizontal_first = y1 == y2 and x2 == x3 and y3 == y4 and x4 == x1
+    if not (vertical_first or horizontal_first):
+        return None
+    return KIND_RECTANGLE, (x1, y1, x3, y3, 0.0)
+
+def entity_rows(entity):
+    # DXF 엔티티를 저장소 행 (종류, 좌표 5개) 목록으로 변환, 지원하지 않으면 빈 목록
+    # 폴리라인은 선/호로 분해 (원래 폴리라인 구조는 보존하지 않음)
+    dxftype = entity.dxftype()
+    if dxftype == 'LINE':
+        start = entity.dxf.start
+        end = entity.dxf.end
+        return [(KIND_LINE, (start[0], start[1], end[0], end[1], 0.0))]
+    if dxftype == 'CIRCLE':
+        center = entity.dxf.center
+        return [(KIND_CIRCLE, (center[0], center[1], entity.dxf.radius, 0.0, 0.0))]
+    if dxftype == 'ARC':
+        center = entity.dxf.center
+        return [(KIND_ARC, (center[0], center[1], entity.dxf.radius, entity.dxf.start_angle, entity.dxf.end_angle))]
+    if dxftype in ('LWPOLYLINE', 'POLYLINE'):
+        row = rectangle_row(entity)
+        if row is not None:
+            return [row]
+        rows = []
+        for part in entity.virtual_entities():
+            rows.extend(entity_rows(part))
+        return rows
+    # 기타 엔티티 처리
+    return []
+
+def insert_rows(entity):
+    # INSERT 를 (블록 이름, 변환) 목록으로 변환 (MINSERT 배열은 참조 여러 개로 펼침)
+    inserts = entity.multi_insert() if entity.mcount > 1 else [entity]
+    rows = []
+    for insert in inserts:
+        point = insert.dxf.insert
+        rows.append((insert.dxf.name, (point[0], point[1], insert.dxf.xscale, insert.dxf.yscale, insert.dxf.rotation)))
+    return rows
+
+def read_blocks(doc):
+    # 배치(레이아웃)용 블록을 뺀 블록 정의를 {이름: Block} 으로 읽음
+    blocks = {}
+    for block_layout in doc.blocks:
+        if block_layout.is_any_layout:
+            continue
+        base = block_layout.block.dxf.base_point
+        block = Block(block_layout.name, (base[0], base[1]))
+        kinds, coords, names, transforms = [], [], [], []
+        for entity in block_layout:
+            if entity.dxftype() == 'INSERT':
+                for name, transform in insert_rows(entity):
+                    names.append(name)
+                    transforms.append(transform)
+                continue
+            for kind, values in entity_rows(entity):
+                kinds.append(kind)
+                coords.append(values)
+        if kinds:
+            block.shapes.extend(kinds, coords)
+        if names:
+            block.inserts.extend(names, transforms)
+        blocks[block.name] = block
+    return blocks
+
+def read_streaming_blocks(filename):
+    # iterdxf 는 모형 공간만 읽으므로, ENTITIES 앞부분(블록 정의 포함)만 임시 DXF 로 떼어 내 읽음
+    source = iterdxf.opendxf(filename)
+    handle, temp = tempfile.mkstemp(suffix='.dxf')
+    os.close(handle)
+    try:
+        source.export(temp).close()
+        return read_blocks(ezdxf.readfile(temp))
+    finally:
+        source.close()
+        os.remove(temp)
+
+class RowBatch:
+    # 레이어별 도형 행과 블록 참조를 모았다가 NumPy 배열 묶음으로 넘김
+    def __init__(self):
+        self.layers = {}
+        self.inserts = {}
+        self.count = 0
+
+    def add(self, layer_name, kind, values):
+        kinds, coords = self.layers.setdefault(layer_name, ([], []))
+        kinds.append(kind)
+        coords.append(values)
+        self.count += 1
+
+    def add_insert(self, layer_name, name, transform):
+        names, transforms = self.inserts.setdefault(layer_name, ([], []))
+        names.append(name)
+        transforms.append(transform)
+        self.count += 1
+
+    def arrays(self):
+        # {'shapes': {레이어명: (kinds, coords)}, 'inserts': {레이어명: (블록 이름 목록, 변환)}}
+        return {
+            'shapes': {layer_name: (np.array(kinds, dtype=np.int8),
+                                    np.array(coords, dtype=np.float64).reshape(-1, COORD_COLUMNS))
+                       for layer_name, (kinds, coords) in self.layers.items()},
+            'inserts': {layer_name: (names, np.array(transforms, dtype=np.float64).reshape(-1, 5))
+                        for layer_name, (names, transforms) in self.inserts.items()},
+        }
+
+def read_document(filename):
+    # 프로세스 풀 작업용: 해석한 문서는 피클로 부모 프로세스에 넘어감
+    return ezdxf.readfile(filename)
+
+def iter_modelspace(filename, streaming=False, progress=None, blocks=None):
+    # streaming=True 이면 iterdxf 로 문서 전체를 메모리에 올리지 않고 모형 공간 엔티티를 순서대로 읽음
+    # progress(처리한 엔티티 수, 전체 수) 는 CHUNK_SIZE 마다 호출 (스트리밍은 전체 수를 모르므로 0)
+    # blocks 사전을 넘기면 엔티티보다 먼저 블록 정의를 읽어 채움
+    if not streaming:
+        doc = ezdxf.readfile(filename)
+        if blocks is not None:
+            blocks.update(read_blocks(doc))
+        msp = doc.modelspace()
+        total = len(msp)
+        entities = msp
+    else:
+        if blocks is not None:
+            blocks.update(read_streaming_blocks(filename))
+        doc = iterdxf.opendxf(filename)
+        total = 0
+        entities = doc.modelspace()
+    try:
+        for count, entity in enumerate(entities, 1):
+            yield entity
+            if progress is not None and count % CHUNK_SIZE == 0:
+                progress(count, total)
+        if progress is not None:
+            progress(total, total)
+    finally:
+        if streaming:
+            doc.close()
+
+def iter_dxf_batches(filename, streaming=False, chunk_size=CHUNK_SIZE, progress=None):
+    # 블록 정의 묶음 {'blocks': {이름: Block}} 을 먼저, 이어서 CHUNK_SIZE 개씩 변환한 도형/참조 묶음을 차례로 반환
+    blocks = {}
+    batch = RowBatch()
+    for entity in iter_modelspace(filename, streaming, progress, blocks):
+        if blocks:
+            # 첫 엔티티를 읽기 전에 채워진 블록 정의를 먼저 넘김
+            yield {'blocks': blocks}
+            blocks = {}
+        if entity.dxftype() == 'INSERT':
+            for name, transform in insert_rows(entity):
+                batch.add_insert(entity.dxf.layer, name, transform)
+        else:
+            for kind, values in entity_rows(entity):
+                batch.add(entity.dxf.layer, kind, values)
+        if batch.count >= chunk_size:
+            yield batch.arrays()
+            batch = RowBatch()
+    if blocks:
+        # 모형 공간이 비어 있어도 블록 정의는 넘김 (다시 저장할 때 사라지지 않도록)
+        yield {'blocks': blocks}
+    if batch.count:
+        yield batch.arrays()
+
+def save_blocks(doc, blocks):
+    # 블록 정의를 먼저 모두 만든 뒤 채워 중첩 참조 순서와 무관하게 저장
+    for block in blocks.values():
+        doc.blocks.new(name=block.name, base_point=(block.base[0], block.base[1], 0))
+    for block in blocks.values():
+        layout = doc.blocks.get(block.name)
+        block.shapes.add_to_dxf(layout, '0')
+        block.inserts.add_to_dxf(layout, '0')
+
+def save_dxf(filename, stores, progress=None, is_cancelled=None, inserts=None, blocks=None):
+    # {레이어명: GeometryStore} 와 {레이어명: InsertStore} 를 DXF 로 저장, 취소되면 파일을 쓰지 않고 False 반환
+    # 블록 정의는 한 번만 쓰고 참조는 INSERT 로 기록
+    doc = ezdxf.new(dxfversion='R2010')
+    msp = doc.modelspace()
+    inserts = inserts or {}
+    if blocks:
+        save_blocks(doc, blocks)
+    parts = [(layer_name, store) for layer_name, store in stores.items()]
+    parts += [(layer_name, layer_inserts) for layer_name, layer_inserts in inserts.items()]
+    total = sum(len(part) for _, part in parts)
+    done = 0
+    for layer_name, part in parts:
+        if layer_name not in doc.layers:
+            doc.layers.add(name=layer_name)
+        for start in range(0, len(part), CHUNK_SIZE):
+            if is_cancelled is not None and is_cancelled():
+                return False
+            stop = min(start + CHUNK_SIZE, len(part))
+            part.add_to_dxf(msp, layer_name, start, stop)
+            done += stop - start
+            if progress is not None:
+                progress(done, total)
+    doc.saveas(filename)
+    return True
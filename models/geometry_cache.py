@@ -0,0 +1,213 @@
+# models/geometry_cache.py
+# 변환된 DXF 도형 배열을 디스크에 저장해 두었다가 같은 파일을 다시 열 때 메모리 매핑으로 불러옴
+
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from models.geometry_store import COORD_COLUMNS
+from models.blocks import Block
+
+CACHE_VERSION = 2  # 저장 형식이나 엔티티 변환 규칙이 바뀌면 올림
+CACHE_DIR = os.environ.get('PYCADMAN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pycadman', 'dxf'))
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+def entry_dir(filename):
+    # 캐시 항목 위치는 절대 경로로 정함 (같은 파일은 항상 같은 항목을 덮어씀)
+    path = os.path.abspath(filename)
+    return os.path.join(CACHE_DIR, hashlib.blake2b(path.encode('utf-8'), digest_size=16).hexdigest())
+
+def content_hash(filename):
+    digest = hashlib.blake2b(digest_size=32)
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_key(filename):
+    stat = os.stat(filename)
+    return {'version': CACHE_VERSION, 'path': os.path.abspath(filename),
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_meta(directory, meta):
+    # 임시 파일에 쓰고 교체해 중간에 끊겨도 깨진 메타데이터가 남지 않도록 함
+    temp = os.path.join(directory, 'meta.json.tmp')
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(temp, os.path.join(directory, 'meta.json'))
+
+def invalidate(filename):
+    shutil.rmtree(entry_dir(filename), ignore_errors=True)
+
+def load(filename):
+    # 유효한 캐시가 있으면 불러오기 묶음 형식으로 반환, 없으면 None
+    # 도형 배열은 쓰기 시 복사(copy-on-write) 메모리 매핑이라 저장소가 복사 없이 그대로 쓰고 편집해도 파일은 바뀌지 않음
+    directory = entry_dir(filename)
+    meta = read_meta(directory)
+    if meta is None:
+        return None
+    key = file_key(filename)
+    if meta.get('version') != CACHE_VERSION or meta.get('path') != key['path'] or meta.get('size') != key['size']:
+        invalidate(filename)
+        return None
+    if meta.get('mtime_ns') != key['mtime_ns']:
+        # 수정 시각만 바뀐 경우 내용 해시가 같으면 계속 사용
+        if meta.get('hash') != content_hash(filename):
+            invalidate(filename)
+            return None
+        meta['mtime_ns'] = key['mtime_ns']
+        write_meta(directory, meta)
+    try:
+        arrays = {name: np.load(os.path.join(directory, name + '.npy'), mmap_mode='c')
+                  for name in ('kinds', 'coords', 'insert_ids', 'insert_transforms')}
+    except (OSError, ValueError):
+        invalidate(filename)
+        return None
+    # 레이어/블록별 행은 연속 구간으로 저장되어 있으므로 슬라이스만 넘김
+    kinds, coords = arrays['kinds'], arrays['coords']
+    insert_ids, insert_transforms = arrays['insert_ids'], arrays['insert_transforms']
+    block_names = meta['block_names']
+
+    def insert_slice(start, stop):
+        return [block_names[i] for i in insert_ids[start:stop].tolist()], insert_transforms[start:stop]
+
+    blocks = {}
+    for name, base_x, base_y, start, stop, insert_start, insert_stop in meta['blocks']:
+        block = Block(name, (base_x, base_y))
+        block.shapes.extend(kinds[start:stop], coords[start:stop], adopt=True)
+        block.inserts.extend(*insert_slice(insert_start, insert_stop))
+        blocks[name] = block
+    return {
+        'mapped': True,
+        'blocks': blocks,
+        'shapes': {layer_name: (kinds[start:stop], coords[start:stop]) for layer_name, start, stop in meta['layers']},
+        'inserts': {layer_name: insert_slice(start, stop) for layer_name, start, stop in meta['inserts']},
+    }
+
+class CacheWriter:
+    # 불러오기 묶음이 도착할 때마다 레이어별 임시 파일에 덧붙이고 finish() 에서 레이어, 블록 순서대로 이어 붙여 저장
+    # 메모리에는 지금 넘겨받은 묶음만 있으므로 큰 파일도 일정한 메모리로 캐시를 만듦
+    def __init__(self, filename):
+        self.filename = filename
+        self.directory = entry_dir(filename)
+        self.parts_dir = os.path.join(self.directory, 'parts')
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.parts_dir)
+        self.blocks = {}
+        self.shape_counts = {}  # 레이어명 -> 행 수 (처음 나온 순서가 저장 순서)
+        self.insert_counts = {}
+        self.block_names = []  # 참조가 가리키는 블록 이름 (정의가 없는 블록도 이름은 보존)
+        self.block_ids = {}
+        self.part_index = {}  # (종류, 이름) -> 임시 파일 번호
+
+    def part_path(self, kind, index, column):
+        return os.path.join(self.parts_dir, f'{kind}_{index}.{column}')
+
+    def block_id(self, name):
+        if name not in self.block_ids:
+            self.block_ids[name] = len(self.block_names)
+            self.block_names.append(name)
+        return self.block_ids[name]
+
+    def append(self, counts, kind, name, columns):
+        # columns: 확장자 -> 배열, 이름별 임시 파일 끝에 덧붙임 (파일 번호는 이름이 처음 나온 순서)
+        if name not in counts:
+            counts[name] = 0
+            self.part_index[kind, name] = len(self.part_index)
+        index = self.part_index[kind, name]
+        for column, values in columns.items():
+            with open(self.part_path(kind, index, column), 'ab') as f:
+                values.tofile(f)
+        counts[name] += len(next(iter(columns.values())))
+
+    def add_shapes(self, name, kinds, coords):
+        self.append(self.shape_counts, 'shapes', name,
+                    {'kinds': np.asarray(kinds, dtype=np.int8),
+                     'coords': np.asarray(coords, dtype=np.float64).reshape(-1, COORD_COLUMNS)})
+
+    def add_inserts(self, name, names, transforms):
+        self.append(self.insert_counts, 'inserts', name,
+                    {'ids': np.array([self.block_id(block_name) for block_name in names], dtype=np.int32),
+                     'transforms': np.asarray(transforms, dtype=np.float64).reshape(-1, 5)})
+
+    def add(self, batch):
+        # batch: {'shapes': {레이어명: (kinds, coords)}, 'inserts': {레이어명: (블록 이름 목록, 변환)},
+        #         'blocks': {이름: Block}}
+        self.blocks.update(batch.get('blocks', {}))
+        for name, (kinds, coords) in batch.get('shapes', {}).items():
+            self.add_shapes(name, kinds, coords)
+        for name, (names, transforms) in batch.get('inserts', {}).items():
+            self.add_inserts(name, names, transforms)
+
+    def discard(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def copy_parts(self, counts, kind, outputs):
+        # 이름별 임시 파일을 전체 배열 파일의 연속 구간으로 복사하고 (이름, 시작, 끝) 목록 반환
+        ranges = []
+        start = 0
+        for name, count in counts.items():
+            stop = start + count
+            if count:
+                for column, output in outputs.items():
+                    path = self.part_path(kind, self.part_index[kind, name], column)
+                    part = np.memmap(path, dtype=output.dtype, mode='r', shape=(count,) + output.shape[1:])
+                    output[start:stop] = part
+                    del part
+            ranges.append((name, start, stop))
+            start = stop
+        return ranges
+
+    def finish(self):
+        # 블록 도형/참조를 레이어 뒤에 붙이고 배열 파일과 메타데이터를 씀
+        key = file_key(self.filename)
+        key['hash'] = content_hash(self.filename)
+        layer_names = list(self.shape_counts)
+        insert_names = list(self.insert_counts)
+        for block in self.blocks.values():
+            # 레이어 이름과 겹치지 않도록 블록 구간은 ('block', 이름) 으로 구분
+            self.add_shapes(('block', block.name), block.shapes.kinds[:block.shapes.count],
+                            block.shapes.coords[:block.shapes.count])
+            names = [block.inserts.block_name(row) for row in range(block.inserts.count)]
+            self.add_inserts(('block', block.name), names, block.inserts.transforms[:block.inserts.count])
+        total = sum(self.shape_counts.values())
+        insert_total = sum(self.insert_counts.values())
+        # 전체 크기의 파일을 먼저 만들고 구간별로 채워 넣어 배열을 한 번 더 이어 붙이지 않음
+        kinds_out = np.lib.format.open_memmap(os.path.join(self.directory, 'kinds.npy'), mode='w+', dtype=np.int8,
+                                              shape=(total,))
+        coords_out = np.lib.format.open_memmap(os.path.join(self.directory, 'coords.npy'), mode='w+',
+                                               dtype=np.float64, shape=(total, COORD_COLUMNS))
+        ids_out = np.lib.format.open_memmap(os.path.join(self.directory, 'insert_ids.npy'), mode='w+', dtype=np.int32,
+                                            shape=(insert_total,))
+        transforms_out = np.lib.format.open_memmap(os.path.join(self.directory, 'insert_transforms.npy'), mode='w+',
+                                                   dtype=np.float64, shape=(insert_total, 5))
+        shape_ranges = dict((name, (start, stop)) for name, start, stop
+                            in self.copy_parts(self.shape_counts, 'shapes', {'kinds': kinds_out, 'coords': coords_out}))
+        insert_ranges = dict((name, (start, stop)) for name, start, stop
+                             in self.copy_parts(self.insert_counts, 'inserts',
+                                                {'ids': ids_out, 'transforms': transforms_out}))
+        for array in (kinds_out, coords_out, ids_out, transforms_out):
+            array.flush()
+        del kinds_out, coords_out, ids_out, transforms_out
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        key['layers'] = [(name,) + shape_ranges[name] for name in layer_names]
+        key['inserts'] = [(name,) + insert_ranges[name] for name in insert_names]
+        key['blocks'] = [(block.name, block.base[0], block.base[1]) + shape_ranges['block', block.name]
+                         + insert_ranges['block', block.name] for block in self.blocks.values()]
+        key['block_names'] = self.block_names
+        # 메타데이터를 마지막에 써서 배열이 모두 저장된 항목만 유효하게 취급
+        write_meta(self.directory, key)
+
+def save(filename, document):
+    # document: 불러오기 묶음과 같은 형식의 문서 전체 ({'shapes', 'inserts', 'blocks'})
+    writer = CacheWriter(filename)
+    writer.add(document)
+    writer.finish()
@@ -0,0 +1,304 @@
+# models/geometry_store.py
+
+import numpy as np
+from PyQt5.QtCore import QPointF
+from models.shapes import LineShape, CircleShape, RectangleShape, ArcShape
+
+KIND_LINE = 0
+KIND_CIRCLE = 1
+KIND_RECTANGLE = 2
+KIND_ARC = 3
+COORD_COLUMNS = 5
+
+def shape_to_row(shape):
+    # 도형 객체를 (종류, 좌표 4개) 행으로 변환
+    if isinstance(shape, LineShape):
+        return KIND_LINE, (shape.start_point.x(), shape.start_point.y(), shape.end_point.x(), shape.end_point.y(), 0.0)
+    if isinstance(shape, CircleShape):
+        return KIND_CIRCLE, (shape.center_point.x(), shape.center_point.y(), shape.radius, 0.0, 0.0)
+    if isinstance(shape, RectangleShape):
+        return KIND_RECTANGLE, (shape.start_point.x(), shape.start_point.y(), shape.end_point.x(), shape.end_point.y(), 0.0)
+    if isinstance(shape, ArcShape):
+        return KIND_ARC, (shape.center_point.x(), shape.center_point.y(), shape.radius, shape.start_angle, shape.end_angle)
+    raise TypeError(f'지원하지 않는 도형입니다: {type(shape).__name__}')
+
+def rows_bounds(kinds, coords):
+    # 행별 경계 상자 (N, 4) 를 벡터 연산으로 계산
+    bounds = np.empty((len(kinds), 4), dtype=np.float64)
+    bounds[:, 0] = np.minimum(coords[:, 0], coords[:, 2])
+    bounds[:, 1] = np.minimum(coords[:, 1], coords[:, 3])
+    bounds[:, 2] = np.maximum(coords[:, 0], coords[:, 2])
+    bounds[:, 3] = np.maximum(coords[:, 1], coords[:, 3])
+    circles = kinds == KIND_CIRCLE
+    if circles.any():
+        cx, cy, r = coords[circles, 0], coords[circles, 1], coords[circles, 2]
+        bounds[circles] = np.column_stack((cx - r, cy - r, cx + r, cy + r))
+    arcs = kinds == KIND_ARC
+    if arcs.any():
+        bounds[arcs] = arc_bounds(coords[arcs])
+    return bounds
+
+def arc_sweeps(start, end):
+    # 반시계 방향 호의 각도 범위 (시작각과 끝각이 같으면 한 바퀴)
+    sweep = np.mod(end - start, 360.0)
+    return np.where(sweep > 0, sweep, 360.0)
+
+def arc_bounds(coords):
+    # 호의 양 끝점과 호가 지나는 축 방향 극점(0, 90, 180, 270도)으로 경계 계산
+    cx, cy, r, start, end = coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3], coords[:, 4]
+    sweep = arc_sweeps(start, end)
+    angles = np.radians(np.column_stack((start, start + sweep)))
+    xs = cx[:, None] + r[:, None] * np.cos(angles)
+    ys = cy[:, None] + r[:, None] * np.sin(angles)
+    bounds = np.column_stack((xs.min(axis=1), ys.min(axis=1), xs.max(axis=1), ys.max(axis=1)))
+    for axis, column, offset in ((0, 2, 1), (90, 3, 1), (180, 0, -1), (270, 1, -1)):
+        passes = np.mod(axis - start, 360.0) <= sweep
+        center = cx if column in (0, 2) else cy
+        bounds[passes, column] = center[passes] + offset * r[passes]
+    return bounds
+
+class GeometryStore:
+    # 레이어 하나의 도형을 열 단위 배열로 보관
+    # kinds: 도형 종류, coords: 선(x1, y1, x2, y2, 0) / 원(cx, cy, r, 0, 0) / 사각형(x1, y1, x2, y2, 0)
+    #        / 호(cx, cy, r, 시작각, 끝각)
+    # attributes, object_data 는 값이 있는 행만 사전에 보관
+    # version 은 좌표가 바뀔 때마다 증가 (파생 캐시 무효화용)
+    def __init__(self, layer_name=None, capacity=64):
+        self.layer_name = layer_name
+        self.kinds = np.empty(capacity, dtype=np.int8)
+        self.coords = np.empty((capacity, COORD_COLUMNS), dtype=np.float64)
+        self.count = 0
+        self.version = 0
+        self.attributes = {}
+        self.object_data = {}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for row in range(self.count):
+            yield self[row]
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.count
+        if not 0 <= row < self.count:
+            raise IndexError(row)
+        return VIEW_CLASSES[int(self.kinds[row])](self, row)
+
+    def reserve(self, size):
+        capacity = len(self.kinds)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        kinds = np.empty(capacity, dtype=np.int8)
+        kinds[:self.count] = self.kinds[:self.count]
+        coords = np.empty((capacity, COORD_COLUMNS), dtype=np.float64)
+        coords[:self.count] = self.coords[:self.count]
+        self.kinds = kinds
+        self.coords = coords
+
+    def append(self, shape):
+        kind, values = shape_to_row(shape)
+        row = self.count
+        self.reserve(row + 1)
+        self.kinds[row] = kind
+        self.coords[row] = values
+        self.count += 1
+        self.version += 1
+        if shape.attributes:
+            self.attributes[row] = dict(shape.attributes)
+        if shape.object_data:
+            self.object_data[row] = dict(shape.object_data)
+        return self[row]
+
+    def extend(self, kinds, coords, adopt=False):
+        # 배열 묶음을 한 번에 추가하고 추가된 행 번호 범위를 반환
+        # adopt=True 이고 저장소가 비어 있으면 복사하지 않고 넘겨받은 배열을 그대로 씀 (캐시의 메모리 매핑 배열)
+        # 이후 행을 추가하면 reserve() 가 새 배열로 옮김
+        kinds = np.asarray(kinds, dtype=np.int8)
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, COORD_COLUMNS)
+        if adopt and self.count == 0 and len(kinds):
+            self.kinds = kinds
+            self.coords = coords
+            self.count = len(kinds)
+            self.version += 1
+            return np.arange(self.count)
+        start = self.count
+        end = start + len(kinds)
+        self.reserve(end)
+        self.kinds[start:end] = kinds
+        self.coords[start:end] = coords
+        self.count = end
+        self.version += 1
+        return np.arange(start, end)
+
+    def copy(self):
+        # 백그라운드 저장 등에 쓰는 스냅샷 (배열 복사)
+        store = GeometryStore(self.layer_name, max(self.count, 1))
+        store.extend(self.kinds[:self.count], self.coords[:self.count])
+        store.attributes = {row: dict(values) for row, values in self.attributes.items()}
+        store.object_data = {row: dict(values) for row, values in self.object_data.items()}
+        return store
+
+    def clear(self):
+        self.count = 0
+        self.version += 1
+        self.attributes.clear()
+        self.object_data.clear()
+
+    def bounds(self):
+        return rows_bounds(self.kinds[:self.count], self.coords[:self.count])
+
+    def row_bounds(self, row):
+        x1, y1, x2, y2, _ = self.coords[row].tolist()
+        if self.kinds[row] == KIND_CIRCLE:
+            return (x1 - x2, y1 - x2, x1 + x2, y1 + x2)
+        if self.kinds[row] == KIND_ARC:
+            return tuple(arc_bounds(self.coords[row:row + 1])[0].tolist())
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    def extent(self):
+        if self.count == 0:
+            return None
+        bounds = self.bounds()
+        return (bounds[:, 0].min(), bounds[:, 1].min(), bounds[:, 2].max(), bounds[:, 3].max())
+
+    def translate(self, dx, dy):
+        coords = self.coords[:self.count]
+        coords[:, 0] += dx
+        coords[:, 1] += dy
+        kinds = self.kinds[:self.count]
+        two_points = (kinds == KIND_LINE) | (kinds == KIND_RECTANGLE)
+        coords[two_points, 2] += dx
+        coords[two_points, 3] += dy
+        self.version += 1
+
+    def rows_of(self, kind):
+        return np.flatnonzero(self.kinds[:self.count] == kind)
+
+    def add_to_dxf(self, msp, layer_name, start=0, stop=None):
+        dxfattribs = {'layer': layer_name}
+        stop = self.count if stop is None else stop
+        for kind, (x1, y1, x2, y2, end) in zip(self.kinds[start:stop].tolist(), self.coords[start:stop].tolist()):
+            if kind == KIND_LINE:
+                msp.add_line((x1, y1, 0), (x2, y2, 0), dxfattribs=dxfattribs)
+            elif kind == KIND_CIRCLE:
+                msp.add_circle((x1, y1, 0), x2, dxfattribs=dxfattribs)
+            elif kind == KIND_ARC:
+                msp.add_arc((x1, y1, 0), x2, y2, end, dxfattribs=dxfattribs)
+            else:
+                points = [(x1, y1, 0), (x1, y2, 0), (x2, y2, 0), (x2, y1, 0), (x1, y1, 0)]
+                msp.add_lwpolyline(points, close=True, dxfattribs=dxfattribs)
+
+    def to_geometries(self):
+        # Shape.to_geometry 와 같은 형식의 사전 목록
+        geometries = []
+        rows = zip(self.kinds[:self.count].tolist(), self.coords[:self.count].tolist())
+        for row, (kind, (x1, y1, x2, y2, _)) in enumerate(rows):
+            if kind == KIND_LINE:
+                geometries.append({'type': 'LINESTRING', 'coordinates': [(x1, y1), (x2, y2)]})
+            elif kind == KIND_CIRCLE:
+                geometries.append({'type': 'POINT', 'coordinates': (x1, y1)})
+            elif kind == KIND_ARC:
+                geometries.append(self[row].to_geometry())
+            else:
+                coordinates = [(x1, y1), (x1, y2), (x2, y2), (x2, y1), (x1, y1)]
+                geometries.append({'type': 'POLYGON', 'coordinates': [coordinates]})
+        return geometries
+
+class StoredShape:
+    # GeometryStore 의 한 행을 가리키는 가벼운 뷰 (기존 Shape API 유지)
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __eq__(self, other):
+        return isinstance(other, StoredShape) and other.store is self.store and other.row == self.row
+
+    def __hash__(self):
+        return hash((id(self.store), self.row))
+
+    @property
+    def attributes(self):
+        return self.store.attributes.setdefault(self.row, {})
+
+    @attributes.setter
+    def attributes(self, value):
+        self.store.attributes[self.row] = value
+
+    @property
+    def object_data(self):
+        return self.store.object_data.setdefault(self.row, {})
+
+    @object_data.setter
+    def object_data(self, value):
+        self.store.object_data[self.row] = value
+
+    @property
+    def layer_name(self):
+        return self.store.layer_name
+
+    @layer_name.setter
+    def layer_name(self, value):
+        pass
+
+    @property
+    def _bounds(self):
+        return self.store.row_bounds(self.row)
+
+    @_bounds.setter
+    def _bounds(self, value):
+        pass  # 경계는 항상 좌표 배열에서 계산
+
+    def point(self, column):
+        coords = self.store.coords[self.row]
+        return QPointF(coords[column], coords[column + 1])
+
+    def set_point(self, column, point):
+        coords = self.store.coords[self.row]
+        coords[column] = point.x()
+        coords[column + 1] = point.y()
+        self.store.version += 1
+
+class StoredLineShape(StoredShape, LineShape):
+    start_point = property(lambda self: self.point(0), lambda self, p: self.set_point(0, p))
+    end_point = property(lambda self: self.point(2), lambda self, p: self.set_point(2, p))
+
+class StoredRectangleShape(StoredShape, RectangleShape):
+    start_point = property(lambda self: self.point(0), lambda self, p: self.set_point(0, p))
+    end_point = property(lambda self: self.point(2), lambda self, p: self.set_point(2, p))
+
+class StoredCircleShape(StoredShape, CircleShape):
+    center_point = property(lambda self: self.point(0), lambda self, p: self.set_point(0, p))
+
+    @property
+    def radius(self):
+        return float(self.store.coords[self.row, 2])
+
+    @radius.setter
+    def radius(self, value):
+        self.store.coords[self.row, 2] = value
+        self.store.version += 1
+
+class StoredArcShape(StoredShape, ArcShape):
+    center_point = property(lambda self: self.point(0), lambda self, p: self.set_point(0, p))
+
+    def column(self, index):
+        return float(self.store.coords[self.row, index])
+
+    def set_column(self, index, value):
+        self.store.coords[self.row, index] = value
+        self.store.version += 1
+
+    radius = property(lambda self: self.column(2), lambda self, value: self.set_column(2, value))
+    start_angle = property(lambda self: self.column(3), lambda self, value: self.set_column(3, value))
+    end_angle = property(lambda self: self.column(4), lambda self, value: self.set_column(4, value))
+
+VIEW_CLASSES = {
+    KIND_LINE: StoredLineShape,
+    KIND_CIRCLE: StoredCircleShape,
+    KIND_RECTANGLE: StoredRectangleShape,
+    KIND_ARC: StoredArcShape,
+}
@@ -0,0 +1,32 @@
+# models/output_paths.py
+# 일괄 처리 결과 파일 이름 정하기 (이름이 같은 입력 파일끼리 덮어쓰지 않도록)
+
+import os
+from pathlib import Path
+
+def output_paths(inputs, output_dir, suffix):
+    # 입력 파일마다 출력 경로 (입력 순서), 기본은 출력 폴더/파일이름 + suffix
+    # 파일 이름이 같은 입력끼리는 공통 상위 폴더 아래의 폴더 구조를 출력 폴더에 그대로 만들어 덮어쓰지 않게 함
+    output_dir = Path(output_dir)
+    groups = {}
+    for path in inputs:
+        groups.setdefault(Path(path).stem, []).append(Path(path))
+    outputs = {}
+    used = set()
+    for stem, paths in groups.items():
+        if len(paths) == 1:
+            folders = [output_dir]
+        else:
+            parents = [path.resolve().parent for path in paths]
+            base = Path(os.path.commonpath(parents))
+            folders = [output_dir / parent.relative_to(base) for parent in parents]
+        for path, folder in zip(paths, folders):
+            output = folder / (stem + suffix)
+            number = 2
+            while output in used:
+                # 같은 파일을 다른 경로 표기로 두 번 넘긴 경우
+                output = folder / f'{stem}_{number}{suffix}'
+                number += 1
+            used.add(output)
+            outputs.setdefault(path, []).append(output)
+    return [outputs[Path(path)].pop(0) for path in inputs]
@@ -0,0 +1,267 @@
+# models/parcel_analysis.py
+# 연속지적도와 구획선 교차 분석
+# 구획선 범위로 후보 필지만 공간 색인에서 추린 뒤, 가까운 필지끼리 묶어 작업 프로세스에서 나눠 교차시키고 합침
+# 일괄 실행: python -m models.parcel_analysis 지적도.shp 'boundaries/*.shp' --field 구역 --output outputs
+
+import argparse
+import glob
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+from models import parcel_report, cadastral_cache
+from models.output_paths import output_paths
+
+CHUNK_PARCELS = 20000  # 작업 하나가 맡을 후보 필지 수
+EXTENT_MARGIN = 1e-6  # 좌표계를 바꾼 범위에 둘 여유 (범위 크기 대비)
+DENSIFY_POINTS = 21  # 범위를 다른 좌표계로 옮길 때 변마다 추가로 변환할 점 수
+CANCEL_POLL_SECONDS = 0.2  # 묶음 결과를 기다리며 취소 여부를 확인하는 간격
+ORDER_COLUMN = '__parcel_order'  # 묶음 결과를 원래 필지 순서로 되돌릴 때 쓰는 임시 열
+
+def boundary_extents(boundary_gdf, crs):
+    # 구획선 도형별 범위 (N, 4) 를 지적도 좌표계로 옮김, 빈 도형은 제외
+    bounds = boundary_gdf.geometry.bounds.to_numpy()
+    bounds = bounds[~np.isnan(bounds).any(axis=1)]
+    if crs is None or boundary_gdf.crs is None or boundary_gdf.crs == crs or len(bounds) == 0:
+        return bounds
+    # 좌표계를 바꾸면 범위의 변이 휘므로 변 위의 점까지 변환하고 약간의 여유를 둠
+    transformer = Transformer.from_crs(boundary_gdf.crs, crs, always_xy=True)
+    extents = np.array([transformer.transform_bounds(*b, densify_pts=DENSIFY_POINTS) for b in bounds.tolist()])
+    margin = (extents[:, 2:] - extents[:, :2]).max(axis=1, keepdims=True) * EXTENT_MARGIN
+    return np.hstack((extents[:, :2] - margin, extents[:, 2:] + margin))
+
+def candidate_positions(cadastral_gdf, extents):
+    # 범위 상자 중 하나라도 겹치는 필지 위치 (원래 순서로 정렬)
+    if len(extents) == 0:
+        return np.empty(0, dtype=np.intp)
+    boxes = shapely.box(extents[:, 0], extents[:, 1], extents[:, 2], extents[:, 3])
+    return np.unique(cadastral_gdf.sindex.query(boxes)[1])
+
+def spatial_chunks(gdf, chunk_size=CHUNK_PARCELS):
+    # 범위 중심을 x 순서의 세로 띠로 나누고 띠 안에서 y 순서로 chunk_size 개씩 묶음
+    # 묶음마다 위치 배열을 원래 순서로 정렬해 반환
+    count = len(gdf)
+    if count <= chunk_size:
+        return [np.arange(count)]
+    bounds = gdf.geometry.bounds.to_numpy()
+    center_x = (bounds[:, 0] + bounds[:, 2]) / 2
+    center_y = (bounds[:, 1] + bounds[:, 3]) / 2
+    strips = int(np.ceil(np.sqrt(np.ceil(count / chunk_size))))
+    x_rank = np.empty(count, dtype=np.int64)
+    x_rank[np.argsort(center_x, kind='stable')] = np.arange(count)
+    order = np.lexsort((center_y, x_rank * strips // count))
+    return [np.sort(order[start:start + chunk_size]) for start in range(0, count, chunk_size)]
+
+def intersect_chunk(parcels, boundary_gdf):
+    # 작업 프로세스에서 실행
+    return gpd.overlay(parcels, boundary_gdf, how='intersection')
+
+def prepare_parcels(cadastral_gdf, boundary_gdf):
+    # 구획선과 범위가 겹치는 필지만 골라 구획선 좌표계로 변환
+    extents = boundary_extents(boundary_gdf, cadastral_gdf.crs)
+    positions = candidate_positions(cadastral_gdf, extents)
+    return cadastral_gdf.iloc[positions].to_crs(boundary_gdf.crs)
+
+def intersect_parcels(cadastral_gdf, boundary_gdf, workers=None, chunk_size=CHUNK_PARCELS, pool=None, is_cancelled=None):
+    # gpd.overlay(cadastral_gdf.to_crs(boundary_gdf.crs), boundary_gdf, how='intersection') 와 같은 표를 반환
+    return overlay_parcels(prepare_parcels(cadastral_gdf, boundary_gdf), boundary_gdf, workers, chunk_size, pool,
+                           is_cancelled)
+
+def overlay_parcels(parcels, boundary_gdf, workers=None, chunk_size=CHUNK_PARCELS, pool=None, is_cancelled=None):
+    # 이미 구획선 좌표계로 바꾼 후보 필지(원래 순서)를 묶음별로 교차
+    # pool 을 넘기면 그 프로세스 풀을 쓰고, 없으면 묶음이 둘 이상일 때만 새로 만듦
+    # is_cancelled() 가 참이 되면 남은 묶음을 취소하고 None 반환
+    chunks = spatial_chunks(parcels, chunk_size)
+    if len(chunks) == 1:
+        return gpd.overlay(parcels, boundary_gdf, how='intersection')
+
+    parcels = parcels.assign(**{ORDER_COLUMN: np.arange(len(parcels))})
+    jobs = []
+    for chunk in chunks:
+        part = parcels.iloc[chunk]
+        # 묶음 범위에 걸치는 구획선만 넘김 (원래 순서 유지)
+        nearby = np.sort(boundary_gdf.sindex.query(shapely.box(*part.total_bounds)))
+        if len(nearby):
+            jobs.append((part, boundary_gdf.iloc[nearby]))
+    if not jobs:
+        return gpd.overlay(parcels.iloc[:0].drop(columns=ORDER_COLUMN), boundary_gdf, how='intersection')
+
+    if pool is not None:
+        results = run_chunks(pool, jobs, is_cancelled)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+        try:
+            results = run_chunks(executor, jobs, is_cancelled)
+        finally:
+            # 취소했으면 실행 중인 묶음을 기다리지 않음
+            executor.shutdown(wait=False, cancel_futures=True)
+    if results is None:
+        return None
+    return merge_chunks(results)
+
+def run_chunks(executor, jobs, is_cancelled=None):
+    # 묶음 작업을 모두 제출하고 순서대로 결과를 모음, 기다리는 동안 취소 여부를 주기적으로 확인
+    futures = [executor.submit(intersect_chunk, part, nearby) for part, nearby in jobs]
+    results = []
+    for future in futures:
+        while not wait([future], timeout=CANCEL_POLL_SECONDS).done:
+            if is_cancelled is not None and is_cancelled():
+                for pending in futures:
+                    pending.cancel()
+                return None
+        results.append(future.result())
+    return results
+
+def merge_chunks(results):
+    # 필지 하나는 한 묶음에만 속하므로 원래 필지 순서로 안정 정렬하면 한 번에 교차시킨 결과와 같은 순서가 됨
+    parts = [result for result in results if len(result)] or results[:1]
+    merged = pd.concat(parts, ignore_index=True)
+    order = np.argsort(merged[ORDER_COLUMN].to_numpy(), kind='stable')
+    return merged.iloc[order].drop(columns=ORDER_COLUMN).reset_index(drop=True)
+
+def add_compensation(intersection):
+    # 면적과 보상금액(면적 × 공시지가) 열 추가, 공시지가 필드가 없으면 보상금액을 0 으로 두고 False 반환
+    intersection['area'] = intersection.geometry.area
+    if '공시지가' in intersection.columns:
+        intersection['compensation'] = intersection['area'] * intersection['공시지가']
+        return True
+    intersection['compensation'] = 0
+    return False
+
+def summarize(intersection, field_name):
+    # 구분 필드별 면적 합계, 필지 수, 공시지가, 보상금액
+    return intersection.groupby(field_name).agg({
+        'area': 'sum',
+        'geometry': 'count',
+        '공시지가': 'first',
+        'compensation': 'sum'
+    }).rename(columns={'geometry': '필지 수', '공시지가': '공시지가', 'area': '면적 합계', 'compensation': '보상금액'})
+
+class CadastralLayer:
+    # 연속지적도를 구획선 좌표계별로 한 번만 준비(변환한 필지와 공간 색인)해 두고 모든 구획선 분석에 재사용
+    # use_cache=True 이면 변환해 둔 지적도 캐시(models.cadastral_cache)에서 구획선 범위에 걸치는 필지만 읽고,
+    # 아니면 원본을 한 번 읽어 구획선 범위의 후보만 변환
+    def __init__(self, cadastral_file, encoding='utf-8', use_cache=True):
+        self.filename = cadastral_file
+        self.encoding = encoding
+        self.use_cache = use_cache
+        self.source = None
+        self.projected = {}  # 좌표계 -> 변환한 후보 필지 (원래 순서)
+
+    def prepare(self, boundaries):
+        # boundaries: 구획선 GeoDataFrame 목록, 좌표계마다 모든 구획선 범위의 후보를 모아 한 번에 준비
+        groups = {}
+        for boundary_gdf in boundaries:
+            groups.setdefault(boundary_gdf.crs, []).append(boundary_gdf)
+        for crs, group in groups.items():
+            if self.use_cache:
+                extents = np.vstack([boundary_extents(boundary_gdf, crs) for boundary_gdf in group])
+                parcels = cadastral_cache.load(self.filename, crs, extents, self.encoding)
+            else:
+                if self.source is None:
+                    self.source = gpd.read_file(self.filename, encoding=self.encoding)
+                extents = np.vstack([boundary_extents(boundary_gdf, self.source.crs) for boundary_gdf in group])
+                parcels = self.source.iloc[candidate_positions(self.source, extents)].to_crs(crs)
+            parcels.sindex  # 색인을 미리 만들어 둠
+            self.projected[crs] = parcels
+
+    def parcels_for(self, boundary_gdf):
+        # 구획선 좌표계로 변환한 필지 중 범위가 겹치는 것 (원래 순서)
+        if boundary_gdf.crs not in self.projected:
+            self.prepare([boundary_gdf])
+        parcels = self.projected[boundary_gdf.crs]
+        return parcels.iloc[candidate_positions(parcels, boundary_extents(boundary_gdf, boundary_gdf.crs))]
+
+def analyze_boundary(parcels, boundary_gdf, field_name, output, detail_format='xlsx'):
+    # 작업 프로세스에서 구획선 하나의 교차/면적/보상금액/통계를 구해 엑셀로 저장
+    # (교차 필지 수, 공시지가 필드 유무) 반환
+    intersection = gpd.overlay(parcels, boundary_gdf, how='intersection')
+    has_price = add_compensation(intersection)
+    stats = summarize(intersection, field_name)
+    parcel_report.export_to_excel(stats, intersection, field_name, output, detail_format)
+    return len(intersection), has_price
+
+def find_boundaries(patterns):
+    # 파일 경로 또는 glob 패턴 목록 (셸이 펼치지 않은 패턴도 처리), 중복 제거
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths += [Path(match) for match in matches if Path(match) not in paths]
+    return paths
+
+def run_batch(cadastral_file, boundary_files, field_name, output_dir, workers=None, encoding='utf-8', progress=None,
+              detail_format='xlsx', use_cache=True):
+    # 지적도는 한 번만 읽고 변환해 모든 구획선 분석에 재사용 (캐시가 있으면 구획선 범위만 읽음)
+    # 구획선별 분석은 작업 프로세스에서 병렬 실행
+    # 끝나는 순서대로 progress(완료 수, 전체 수, 결과) 호출, 결과는 (구획선 경로, 출력 경로, 교차 필지 수, 오류 메시지)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    layer = CadastralLayer(cadastral_file, encoding, use_cache)
+    total = len(boundary_files)
+    results = []
+    boundaries = []
+    for path, output in zip(boundary_files, output_paths(boundary_files, output_dir, '.xlsx')):
+        try:
+            boundaries.append((path, output, gpd.read_file(path, encoding=encoding)))
+        except Exception as e:
+            result = (str(path), '', 0, str(e))
+            results.append(result)
+            if progress is not None:
+                progress(len(results), total, result)
+    layer.prepare([boundary_gdf for _, _, boundary_gdf in boundaries])
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {}
+        for path, output, boundary_gdf in boundaries:
+            output.parent.mkdir(parents=True, exist_ok=True)
+            future = pool.submit(analyze_boundary, layer.parcels_for(boundary_gdf), boundary_gdf, field_name, str(output),
+                                 detail_format)
+            futures[future] = (str(path), str(output))
+        for future in as_completed(futures):
+            path, output = futures[future]
+            try:
+                count, has_price = future.result()
+                result = (path, output, count, '' if has_price else '공시지가 필드가 없습니다.')
+            except Exception as e:
+                result = (path, output, 0, str(e))
+            results.append(result)
+            if progress is not None:
+                progress(len(results), total, result)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='연속지적도/구획선 필지 보상 분석 일괄 실행')
+    parser.add_argument('cadastral', help='연속지적도 파일')
+    parser.add_argument('boundaries', nargs='+', help='구획선 파일 또는 glob 패턴')
+    parser.add_argument('--field', required=True, help='속성값을 구분할 필드명')
+    parser.add_argument('--output', default='outputs')
+    parser.add_argument('--workers', type=int, default=None, help='작업 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--detail-format', choices=parcel_report.DETAIL_FORMATS, default='xlsx',
+                        help='상세 자료 형식 (xlsx 는 시트 최대 행 수를 넘으면 csv 로 따로 저장)')
+    parser.add_argument('--no-cache', action='store_true', help='변환된 지적도 캐시를 쓰지 않고 원본을 읽음')
+    args = parser.parse_args(argv)
+
+    boundary_files = find_boundaries(args.boundaries)
+    if not boundary_files:
+        print('분석할 구획선 파일이 없습니다.')
+        return 1
+
+    def progress(done, total, result):
+        path, output, count, error = result
+        print(f'[{done}/{total}] {path} -> {output} ({count}개 필지)' + (f'  {error}' if error else ''))
+
+    start = time.perf_counter()
+    results = run_batch(args.cadastral, boundary_files, args.field, args.output, args.workers, args.encoding, progress,
+                        args.detail_format, not args.no_cache)
+    failed = sum(1 for _, _, _, error in results if error)
+    print(f'{len(results) - failed}개 완료, {failed}개 오류/경고 ({time.perf_counter() - start:.1f} s)')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
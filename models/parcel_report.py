@@ -0,0 +1,94 @@
+# models/parcel_report.py
+# 필지 교차 분석 결과(통계/상세) 내보내기
+# 쓰기 전용 통합문서에 열 배열을 묶음 단위로 흘려 쓰므로 행 수가 많아도 메모리가 늘지 않음
+
+from pathlib import Path
+import geopandas as gpd
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Border, Side
+
+EXCEL_MAX_ROWS = 1048576  # 시트 하나의 최대 행 수 (머리글 포함)
+CHUNK_ROWS = 50000  # 한 번에 열 배열로 꺼낼 행 수
+DETAIL_FORMATS = ('xlsx', 'csv', 'parquet')
+OVERFLOW_FORMAT = 'csv'  # 상세 표가 시트에 다 들어가지 않을 때 쓰는 형식
+
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+def styled_row(ws, size):
+    # 테두리를 미리 입힌 셀 한 줄, 값만 바꿔 가며 행마다 다시 씀 (쓰기 전용 시트는 append 할 때 바로 기록)
+    row = []
+    for _ in range(size):
+        cell = WriteOnlyCell(ws)
+        cell.border = THIN_BORDER
+        row.append(cell)
+    return row
+
+def column_values(series):
+    # 열 하나를 파이썬 값 목록으로 한 번에 변환 (결측값은 빈 셀)
+    values = series.to_numpy(dtype=object)
+    values[series.isna().to_numpy()] = None
+    return values.tolist()
+
+def write_table(ws, header, frame, chunk_rows=CHUNK_ROWS):
+    row = styled_row(ws, len(header))
+    for cell, value in zip(row, header):
+        cell.value = value
+    ws.append(row)
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        columns = [column_values(chunk.iloc[:, i]) for i in range(chunk.shape[1])]
+        for values in zip(*columns):
+            for cell, value in zip(row, values):
+                cell.value = value
+            ws.append(row)
+
+def detail_table(detail_df):
+    # 도형 열은 엑셀/CSV 셀에 쓸 수 없으므로 제외 (면적 열로 대신함)
+    if isinstance(detail_df, gpd.GeoDataFrame):
+        return pd.DataFrame(detail_df.drop(columns=detail_df.geometry.name))
+    return detail_df
+
+def detail_filename(filename, detail_format):
+    path = Path(filename)
+    return str(path.with_name(path.stem + '_상세.' + detail_format))
+
+def write_detail_file(detail, filename, detail_format):
+    if detail_format == 'csv':
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        detail.to_csv(filename, index=False, encoding='utf-8-sig')
+    elif detail_format == 'parquet':
+        detail.to_parquet(filename, index=False)
+    else:
+        raise ValueError(f'지원하지 않는 상세 자료 형식입니다: {detail_format}')
+
+def export_to_excel(stats_df, detail_df, field_name, filename, detail_format='xlsx'):
+    # 통계/상세 시트를 쓰고 상세 자료가 저장된 파일 경로를 반환
+    # detail_format 이 'csv'/'parquet' 이거나 상세 표가 시트 최대 행 수를 넘으면 상세 자료는 별도 파일로 저장
+    detail = detail_table(detail_df)
+    if detail_format == 'xlsx' and len(detail) >= EXCEL_MAX_ROWS:
+        detail_format = OVERFLOW_FORMAT
+
+    wb = Workbook(write_only=True)
+    ws_stats = wb.create_sheet('통계')
+    write_table(ws_stats, [field_name, '면적 합계', '필지 수', '공시지가', '보상금액'],
+                stats_df.reset_index()[[stats_df.index.name, '면적 합계', '필지 수', '공시지가', '보상금액']])
+
+    ws_detail = wb.create_sheet('상세')
+    detail_file = filename
+    if detail_format == 'xlsx':
+        write_table(ws_detail, detail.columns.tolist(), detail)
+    else:
+        detail_file = detail_filename(filename, detail_format)
+        write_detail_file(detail, detail_file, detail_format)
+        ws_detail.append(['상세 자료 파일', detail_file])
+        ws_detail.append(['필지 수', len(detail)])
+
+    wb.save(filename)
+    return detail_file
@@ -0,0 +1,217 @@
+# models/selection.py
+# GeometryStore 행 묶음에 대한 선택 판정 (NumPy 벡터 연산)
+
+import numpy as np
+from models.geometry_store import KIND_LINE, KIND_CIRCLE, KIND_RECTANGLE, KIND_ARC, rows_bounds, arc_sweeps
+
+def segment_distances(x, y, x1, y1, x2, y2):
+    # 점 (x, y) 와 선분들 사이의 유클리드 거리
+    bx = x2 - x1
+    by = y2 - y1
+    length2 = bx * bx + by * by
+    safe = np.where(length2 > 0, length2, 1.0)
+    t = np.clip(((x - x1) * bx + (y - y1) * by) / safe, 0.0, 1.0)
+    t = np.where(length2 > 0, t, 0.0)
+    return np.hypot(x - (x1 + t * bx), y - (y1 + t * by))
+
+def arc_points(coords, count):
+    # 호를 따라 끝점 포함 count 개의 점을 고르게 뽑은 (N, count) 좌표
+    cx, cy, r, start = coords[:, 0:1], coords[:, 1:2], coords[:, 2:3], coords[:, 3:4]
+    sweep = arc_sweeps(coords[:, 3], coords[:, 4])[:, None]
+    angles = np.radians(start + sweep * np.linspace(0.0, 1.0, count))
+    return cx + r * np.cos(angles), cy + r * np.sin(angles)
+
+def angles_on_arc(arcs, x, y):
+    # 호 중심에서 본 점 (x, y) 의 각도가 호의 시작~끝 범위 안인지 (x, y 는 스칼라 또는 (N, k) 배열)
+    cx, cy, start = arcs[:, 0], arcs[:, 1], arcs[:, 3]
+    sweep = arc_sweeps(arcs[:, 3], arcs[:, 4])
+    if np.ndim(x) == 2:
+        cx, cy, start, sweep = cx[:, None], cy[:, None], start[:, None], sweep[:, None]
+    angles = np.degrees(np.arctan2(y - cy, x - cx))
+    return np.mod(angles - start, 360.0) <= sweep
+
+def hit_mask(kinds, coords, x, y, tolerance):
+    # 선: 선분까지 거리, 원: 원주까지 거리, 사각형: 내부 포함 (Shape.contains 와 같은 기준)
+    mask = np.zeros(len(kinds), dtype=bool)
+    x1, y1, x2, y2 = coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]
+    lines = kinds == KIND_LINE
+    if lines.any():
+        mask[lines] = segment_distances(x, y, x1[lines], y1[lines], x2[lines], y2[lines]) < tolerance
+    circles = kinds == KIND_CIRCLE
+    if circles.any():
+        mask[circles] = np.abs(np.hypot(x - x1[circles], y - y1[circles]) - x2[circles]) < tolerance
+    rectangles = kinds == KIND_RECTANGLE
+    if rectangles.any():
+        bounds = rows_bounds(kinds[rectangles], coords[rectangles])
+        mask[rectangles] = ((bounds[:, 0] <= x) & (x <= bounds[:, 2])
+                            & (bounds[:, 1] <= y) & (y <= bounds[:, 3]))
+    arcs = kinds == KIND_ARC
+    if arcs.any():
+        # 점의 각도가 호 범위 안이면 원주까지 거리, 밖이면 가까운 끝점까지 거리
+        arc = coords[arcs]
+        ends_x, ends_y = arc_points(arc, 2)
+        ends = np.hypot(x - ends_x, y - ends_y).min(axis=1)
+        ring = np.abs(np.hypot(x - arc[:, 0], y - arc[:, 1]) - arc[:, 2])
+        mask[arcs] = np.where(angles_on_arc(arc, x, y), ring, ends) < tolerance
+    return mask
+
+def window_mask(kinds, coords, rect):
+    # 윈도우 선택: 경계 상자가 사각형 안에 완전히 들어가는 도형
+    min_x, min_y, max_x, max_y = rect
+    bounds = rows_bounds(kinds, coords)
+    return ((bounds[:, 0] >= min_x) & (bounds[:, 2] <= max_x)
+            & (bounds[:, 1] >= min_y) & (bounds[:, 3] <= max_y))
+
+def crossing_mask(kinds, coords, rect):
+    # 걸침 선택: 선은 선분이 사각형과 만나는지, 원은 원주가 사각형을 지나는지, 사각형은 영역이 겹치는지
+    min_x, min_y, max_x, max_y = rect
+    bounds = rows_bounds(kinds, coords)
+    mask = ((bounds[:, 0] <= max_x) & (bounds[:, 2] >= min_x)
+            & (bounds[:, 1] <= max_y) & (bounds[:, 3] >= min_y))
+    x1, y1, x2, y2 = coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]
+
+    lines = mask & (kinds == KIND_LINE)
+    if lines.any():
+        # 사각형 네 꼭짓점이 모두 선분의 같은 쪽에 있으면 만나지 않음
+        bx = (x2 - x1)[lines]
+        by = (y2 - y1)[lines]
+        sides = np.stack([bx * (cy - y1[lines]) - by * (cx - x1[lines])
+                          for cx, cy in ((min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y))])
+        mask[lines] = ~((sides > 0).all(axis=0) | (sides < 0).all(axis=0))
+
+    circles = mask & (kinds == KIND_CIRCLE)
+    if circles.any():
+        cx, cy, r = x1[circles], y1[circles], x2[circles]
+        near = np.hypot(np.clip(cx, min_x, max_x) - cx, np.clip(cy, min_y, max_y) - cy)
+        far = np.hypot(np.maximum(np.abs(cx - min_x), np.abs(cx - max_x)),
+                       np.maximum(np.abs(cy - min_y), np.abs(cy - max_y)))
+        mask[circles] = (near <= r) & (r <= far)
+
+    arcs = mask & (kinds == KIND_ARC)
+    if arcs.any():
+        # 끝점이 사각형 안에 있거나, 원주와 사각형 변의 교점 중 하나가 호 범위 안에 있으면 걸침
+        arc = coords[arcs]
+        ends_x, ends_y = arc_points(arc, 2)
+        inside = ((ends_x >= min_x) & (ends_x <= max_x) & (ends_y >= min_y) & (ends_y <= max_y)).any(axis=1)
+        mask[arcs] = inside | arc_crosses_edges(arc, rect)
+    return mask
+
+def arc_crosses_edges(arcs, rect):
+    # 호의 원주가 사각형 네 변과 만나는 점(변마다 최대 2개) 중 호 범위 안의 점이 있는지
+    min_x, min_y, max_x, max_y = rect
+    cx, cy, r = arcs[:, 0:1], arcs[:, 1:2], arcs[:, 2:3]
+    xs, ys, valid = [], [], []
+    for edge_x in (min_x, max_x):
+        # 세로 변 x = edge_x 위의 교점 y = cy ± sqrt(r² - dx²)
+        offset = np.sqrt(np.maximum(r * r - (edge_x - cx) ** 2, 0.0))
+        for y in (cy - offset, cy + offset):
+            xs.append(np.full_like(y, edge_x))
+            ys.append(y)
+            valid.append((np.abs(edge_x - cx) <= r) & (y >= min_y) & (y <= max_y))
+    for edge_y in (min_y, max_y):
+        offset = np.sqrt(np.maximum(r * r - (edge_y - cy) ** 2, 0.0))
+        for x in (cx - offset, cx + offset):
+            xs.append(x)
+            ys.append(np.full_like(x, edge_y))
+            valid.append((np.abs(edge_y - cy) <= r) & (x >= min_x) & (x <= max_x))
+    xs, ys, valid = np.hstack(xs), np.hstack(ys), np.hstack(valid)
+    return (valid & angles_on_arc(arcs, xs, ys)).any(axis=1)
+
+def points_in_polygon(px, py, polygon):
+    # 짝홀 규칙으로 점들이 다각형 안에 있는지 판정 (다각형 변 단위 반복, 점 단위 벡터화)
+    inside = np.zeros(len(px), dtype=bool)
+    polygon = np.asarray(polygon, dtype=np.float64)
+    ax, ay = polygon[:, 0], polygon[:, 1]
+    bx, by = np.roll(ax, 1), np.roll(ay, 1)
+    for x1, y1, x2, y2 in zip(ax.tolist(), ay.tolist(), bx.tolist(), by.tolist()):
+        if y1 == y2:
+            continue
+        crosses = (y1 > py) != (y2 > py)
+        x_at = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (px < x_at)
+    return inside
+
+def polygon_edges(polygon):
+    # 닫힌 다각형의 변 (x1, y1, x2, y2) 목록
+    polygon = np.asarray(polygon, dtype=np.float64)
+    ax, ay = polygon[:, 0], polygon[:, 1]
+    return zip(ax.tolist(), ay.tolist(), np.roll(ax, -1).tolist(), np.roll(ay, -1).tolist())
+
+def segments_cross_polygon(x1, y1, x2, y2, polygon):
+    # 선분들이 다각형의 변 중 하나와 만나는지 (접하는 경우 포함)
+    hit = np.zeros(len(x1), dtype=bool)
+    for ax, ay, bx, by in polygon_edges(polygon):
+        d1 = (bx - ax) * (y1 - ay) - (by - ay) * (x1 - ax)
+        d2 = (bx - ax) * (y2 - ay) - (by - ay) * (x2 - ax)
+        d3 = (x2 - x1) * (ay - y1) - (y2 - y1) * (ax - x1)
+        d4 = (x2 - x1) * (by - y1) - (y2 - y1) * (bx - x1)
+        # 같은 직선 위에서 떨어져 있는 경우를 거르기 위해 경계 상자도 겹쳐야 함
+        overlap = ((np.minimum(x1, x2) <= max(ax, bx)) & (np.maximum(x1, x2) >= min(ax, bx))
+                   & (np.minimum(y1, y2) <= max(ay, by)) & (np.maximum(y1, y2) >= min(ay, by)))
+        hit |= (d1 * d2 <= 0) & (d3 * d4 <= 0) & overlap
+    return hit
+
+def circles_cross_polygon(cx, cy, r, polygon):
+    # 원주가 다각형의 변 중 하나와 만나는지 (변까지 최소 거리 <= r <= 최대 거리)
+    hit = np.zeros(len(cx), dtype=bool)
+    for ax, ay, bx, by in polygon_edges(polygon):
+        near = segment_distances(cx, cy, ax, ay, bx, by)
+        far = np.maximum(np.hypot(ax - cx, ay - cy), np.hypot(bx - cx, by - cy))
+        hit |= (near <= r) & (r <= far)
+    return hit
+
+def arcs_cross_polygon(arcs, polygon):
+    # 다각형의 변과 원주의 교점(변마다 최대 2개) 중 호 범위 안의 점이 있는지
+    cx, cy, r = arcs[:, 0], arcs[:, 1], arcs[:, 2]
+    hit = np.zeros(len(arcs), dtype=bool)
+    for ax, ay, bx, by in polygon_edges(polygon):
+        # 변 위의 점 a + t(b - a) 가 원주 위에 있는 t (0 <= t <= 1)
+        dx, dy = bx - ax, by - ay
+        a = dx * dx + dy * dy
+        if a == 0:
+            continue
+        fx, fy = ax - cx, ay - cy
+        b = 2 * (fx * dx + fy * dy)
+        c = fx * fx + fy * fy - r * r
+        disc = b * b - 4 * a * c
+        root = np.sqrt(np.maximum(disc, 0.0))
+        for t in ((-b - root) / (2 * a), (-b + root) / (2 * a)):
+            valid = (disc >= 0) & (t >= 0) & (t <= 1)
+            hit |= valid & angles_on_arc(arcs, ax + t * dx, ay + t * dy)
+    return hit
+
+def lasso_mask(kinds, coords, polygon):
+    # 올가미 선택: 다각형 안에 완전히 들어가는 도형
+    # 도형의 한 점(선/사각형은 모든 꼭짓점)이 안에 있고 도형의 변/원주가 다각형의 변과 만나지 않으면 안에 있음
+    mask = np.zeros(len(kinds), dtype=bool)
+    x1, y1, x2, y2 = coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]
+
+    def all_inside(xs, ys):
+        count = xs.shape[0]
+        inside = points_in_polygon(xs.ravel(), ys.ravel(), polygon)
+        return inside.reshape(count, -1).all(axis=1)
+
+    lines = kinds == KIND_LINE
+    if lines.any():
+        lx1, ly1, lx2, ly2 = x1[lines], y1[lines], x2[lines], y2[lines]
+        mask[lines] = (all_inside(np.column_stack((lx1, lx2)), np.column_stack((ly1, ly2)))
+                       & ~segments_cross_polygon(lx1, ly1, lx2, ly2, polygon))
+    circles = kinds == KIND_CIRCLE
+    if circles.any():
+        cx, cy, r = x1[circles], y1[circles], x2[circles]
+        mask[circles] = (points_in_polygon(cx + r, cy, polygon)
+                         & ~circles_cross_polygon(cx, cy, r, polygon))
+    rectangles = kinds == KIND_RECTANGLE
+    if rectangles.any():
+        rx1, ry1, rx2, ry2 = x1[rectangles], y1[rectangles], x2[rectangles], y2[rectangles]
+        inside = all_inside(np.column_stack((rx1, rx1, rx2, rx2)), np.column_stack((ry1, ry2, ry2, ry1)))
+        for ex1, ey1, ex2, ey2 in ((rx1, ry1, rx1, ry2), (rx1, ry2, rx2, ry2),
+                                   (rx2, ry2, rx2, ry1), (rx2, ry1, rx1, ry1)):
+            inside &= ~segments_cross_polygon(ex1, ey1, ex2, ey2, polygon)
+        mask[rectangles] = inside
+    arcs = kinds == KIND_ARC
+    if arcs.any():
+        arc = coords[arcs]
+        ends_x, ends_y = arc_points(arc, 2)
+        mask[arcs] = points_in_polygon(ends_x[:, 0], ends_y[:, 0], polygon) & ~arcs_cross_polygon(arc, polygon)
+    return mask
@@ -1,13 +1,14 @@
 # models/shapes.py
 
 from PyQt5.QtCore import QPointF, QRectF
-from PyQt5.QtGui import QPainter
+from PyQt5.QtGui import QPainter, QPainterPath
 import math
 
 class Shape:
     def __init__(self):
         self.attributes = {}
         self.object_data = {}
+        self._bounds = None
 
     def draw(self, painter):
         pass
@@ -21,6 +22,15 @@ class Shape:
     def contains(self, pos):
         return False
 
+    def bounds(self):
+        # 경계 상자는 형상이 바뀔 때까지 캐시
+        if self._bounds is None:
+            self._bounds = self.compute_bounds()
+        return self._bounds
+
+    def compute_bounds(self):
+        pass
+
     def rotate(self, angle, center_point=None):
         pass
 
@@ -38,10 +48,16 @@ class LineShape(Shape):
 
     def update(self, pos):
         self.end_point = pos
+        self._bounds = None
 
     def draw(self, painter):
         painter.drawLine(self.start_point, self.end_point)
 
+    def compute_bounds(self):
+        x1, y1 = self.start_point.x(), self.start_point.y()
+        x2, y2 = self.end_point.x(), self.end_point.y()
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
     def add_to_dxf(self, msp, layer_name):
         msp.add_line((self.start_point.x(), self.start_point.y(), 0),
                      (self.end_point.x(), self.end_point.y(), 0),
@@ -65,6 +81,7 @@ class LineShape(Shape):
             center_point = self.get_center()
         self.start_point = self.rotate_point(self.start_point, center_point, angle)
         self.end_point = self.rotate_point(self.end_point, center_point, angle)
+        self._bounds = None
 
     def rotate_point(self, point, center, angle):
         dx = point.x() - center.x()
@@ -107,6 +124,7 @@ class CircleShape(Shape):
         dx = pos.x() - self.center_point.x()
         dy = pos.y() - self.center_point.y()
         self.radius = (dx**2 + dy**2) ** 0.5
+        self._bounds = None
 
     def draw(self, painter):
         rect = QRectF(self.center_point.x() - self.radius,
@@ -114,6 +132,10 @@ class CircleShape(Shape):
                       self.radius * 2, self.radius * 2)
         painter.drawEllipse(rect)
 
+    def compute_bounds(self):
+        x, y = self.center_point.x(), self.center_point.y()
+        return (x - self.radius, y - self.radius, x + self.radius, y + self.radius)
+
     def add_to_dxf(self, msp, layer_name):
         msp.add_circle((self.center_point.x(), self.center_point.y(), 0),
                        self.radius,
@@ -150,11 +172,17 @@ class RectangleShape(Shape):
 
     def update(self, pos):
         self.end_point = pos
+        self._bounds = None
 
     def draw(self, painter):
         rect = QRectF(self.start_point, self.end_point)
         painter.drawRect(rect)
 
+    def compute_bounds(self):
+        x1, y1 = self.start_point.x(), self.start_point.y()
+        x2, y2 = self.end_point.x(), self.end_point.y()
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
     def add_to_dxf(self, msp, layer_name):
         points = [
             (self.start_point.x(), self.start_point.y(), 0),
@@ -180,6 +208,7 @@ class RectangleShape(Shape):
         ys = [pt.y() for pt in rotated_corners]
         self.start_point = QPointF(min(xs), min(ys))
         self.end_point = QPointF(max(xs), max(ys))
+        self._bounds = None
 
     def rotate_point(self, point, center, angle):
         dx = point.x() - center.x()
@@ -215,3 +244,88 @@ class RectangleShape(Shape):
             'geometry': self.to_geometry(),
             'properties': self.attributes
         }
+
+def arc_sweep(start_angle, end_angle):
+    # DXF 호는 시작각에서 끝각까지 반시계 방향 (같으면 한 바퀴)
+    sweep = (end_angle - start_angle) % 360
+    return sweep if sweep > 0 else 360.0
+
+class ArcShape(Shape):
+    # 각도는 DXF 와 같이 도 단위, 장면 좌표계(y 축 뒤집지 않음) 기준 반시계 방향
+    def __init__(self, center_point, radius=0, start_angle=0.0, end_angle=360.0):
+        super().__init__()
+        self.center_point = center_point
+        self.radius = radius
+        self.start_angle = start_angle
+        self.end_angle = end_angle
+
+    def update(self, pos):
+        dx = pos.x() - self.center_point.x()
+        dy = pos.y() - self.center_point.y()
+        self.radius = (dx**2 + dy**2) ** 0.5
+        self._bounds = None
+
+    def path(self):
+        # Qt 의 호 각도는 y 축이 위를 향한다고 보므로 부호를 바꿔 DXF 좌표와 맞춤
+        rect = QRectF(self.center_point.x() - self.radius, self.center_point.y() - self.radius,
+                      self.radius * 2, self.radius * 2)
+        path = QPainterPath()
+        path.arcMoveTo(rect, -self.start_angle)
+        path.arcTo(rect, -self.start_angle, -arc_sweep(self.start_angle, self.end_angle))
+        return path
+
+    def draw(self, painter):
+        painter.drawPath(self.path())
+
+    def point_at(self, angle):
+        radians = math.radians(angle)
+        return (self.center_point.x() + self.radius * math.cos(radians),
+                self.center_point.y() + self.radius * math.sin(radians))
+
+    def compute_bounds(self):
+        # 끝점과 호가 지나는 축 방향 극점으로 경계 계산
+        sweep = arc_sweep(self.start_angle, self.end_angle)
+        points = [self.point_at(self.start_angle), self.point_at(self.start_angle + sweep)]
+        points += [self.point_at(axis) for axis in (0, 90, 180, 270) if (axis - self.start_angle) % 360 <= sweep]
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    def add_to_dxf(self, msp, layer_name):
+        msp.add_arc((self.center_point.x(), self.center_point.y(), 0), self.radius,
+                    self.start_angle, self.end_angle, dxfattribs={'layer': layer_name})
+
+    def contains(self, pos):
+        dx = pos.x() - self.center_point.x()
+        dy = pos.y() - self.center_point.y()
+        distance = (dx**2 + dy**2) ** 0.5
+        angle = math.degrees(math.atan2(dy, dx))
+        on_arc = (angle - self.start_angle) % 360 <= arc_sweep(self.start_angle, self.end_angle)
+        return on_arc and abs(distance - self.radius) < (5 / 1.0)  # 스케일 고려
+
+    def rotate(self, angle, center_point=None):
+        if center_point:
+            dx = self.center_point.x() - center_point.x()
+            dy = self.center_point.y() - center_point.y()
+            radians = math.radians(angle)
+            self.center_point = QPointF(center_point.x() + math.cos(radians) * dx - math.sin(radians) * dy,
+                                        center_point.y() + math.sin(radians) * dx + math.cos(radians) * dy)
+        self.start_angle = (self.start_angle + angle) % 360
+        self.end_angle = (self.end_angle + angle) % 360
+        self._bounds = None
+
+    def to_geometry(self):
+        # 호는 짧은 선분으로 근사
+        sweep = arc_sweep(self.start_angle, self.end_angle)
+        steps = max(int(sweep / 10), 2)
+        return {
+            'type': 'LINESTRING',
+            'coordinates': [self.point_at(self.start_angle + sweep * i / steps) for i in range(steps + 1)]
+        }
+
+    def to_geojson(self):
+        return {
+            'type': 'Feature',
+            'geometry': self.to_geometry(),
+            'properties': self.attributes
+        }
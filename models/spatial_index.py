@@ -0,0 +1,152 @@
+# models/spatial_index.py
+
+import numpy as np
+
+CELL_OFFSET = 2 ** 30  # 셀 좌표를 음이 아닌 정수 키로 만들기 위한 여유
+LARGE_FACTOR = 4  # 셀 크기의 이 배수보다 큰 항목은 따로 전수 검사
+REBUILD_THRESHOLD = 1024
+
+class GridIndex:
+    # 균일 격자 기반 공간 인덱스: 항목(정수 행 번호)별 경계 상자(min_x, min_y, max_x, max_y)를 배열로 보관
+    # 중심이 속한 셀 번호로 정렬해 두고, 질의 시 주변 셀 구간만 이진 탐색으로 잘라 검사
+    def __init__(self, cell_size=100.0, capacity=64):
+        self.cell_size = cell_size
+        self.bounds = np.zeros((capacity, 4), dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.size = 0  # 사용된 최대 행 번호 + 1
+        self.count = 0
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.sorted_rows = np.empty(0, dtype=np.int64)
+        self.large_rows = np.empty(0, dtype=np.int64)
+        self.margin = 0.0  # 정렬된 항목의 최대 반폭 (중심 셀 기준 질의 여유)
+        self.pending = []  # 마지막 정렬 이후 추가/수정된 행
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, row):
+        return 0 <= row < self.size and bool(self.alive[row])
+
+    def reserve(self, size):
+        capacity = len(self.alive)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        bounds = np.zeros((capacity, 4), dtype=np.float64)
+        bounds[:self.size] = self.bounds[:self.size]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:self.size] = self.alive[:self.size]
+        self.bounds = bounds
+        self.alive = alive
+
+    def insert(self, row, bounds):
+        self.reserve(row + 1)
+        self.bounds[row] = bounds
+        if not self.alive[row]:
+            self.alive[row] = True
+            self.count += 1
+        self.size = max(self.size, row + 1)
+        self.pending.append(row)
+
+    def insert_many(self, rows, bounds):
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return
+        self.reserve(int(rows.max()) + 1)
+        self.bounds[rows] = bounds
+        self.count += int(np.count_nonzero(~self.alive[rows]))
+        self.alive[rows] = True
+        self.size = max(self.size, int(rows.max()) + 1)
+        if len(rows) > REBUILD_THRESHOLD:
+            self.build()
+        else:
+            self.pending.extend(rows.tolist())
+
+    def update(self, row, bounds):
+        # 정렬된 위치는 그대로 두고 pending에 넣어 새 경계로도 찾히게 함
+        self.insert(row, bounds)
+
+    def remove(self, row):
+        if row in self:
+            self.alive[row] = False
+            self.count -= 1
+
+    def clear(self):
+        self.alive[:] = False
+        self.size = 0
+        self.count = 0
+        self.sorted_keys = np.empty(0, dtype=np.int64)
+        self.sorted_rows = np.empty(0, dtype=np.int64)
+        self.large_rows = np.empty(0, dtype=np.int64)
+        self.margin = 0.0
+        self.pending = []
+
+    def cell_keys(self, cx, cy):
+        cx = np.clip(cx, -CELL_OFFSET + 1, CELL_OFFSET - 1) + CELL_OFFSET
+        cy = np.clip(cy, -CELL_OFFSET + 1, CELL_OFFSET - 1) + CELL_OFFSET
+        return cx.astype(np.int64) * (2 * CELL_OFFSET) + cy.astype(np.int64)
+
+    def build(self):
+        rows = np.flatnonzero(self.alive[:self.size])
+        bounds = self.bounds[rows]
+        half_w = (bounds[:, 2] - bounds[:, 0]) / 2
+        half_h = (bounds[:, 3] - bounds[:, 1]) / 2
+        large = np.maximum(half_w, half_h) * 2 > self.cell_size * LARGE_FACTOR
+        self.large_rows = rows[large]
+        small = ~large
+        rows = rows[small]
+        bounds = bounds[small]
+        cx = np.floor((bounds[:, 0] + bounds[:, 2]) / 2 / self.cell_size)
+        cy = np.floor((bounds[:, 1] + bounds[:, 3]) / 2 / self.cell_size)
+        keys = self.cell_keys(cx, cy)
+        order = np.argsort(keys, kind='stable')
+        self.sorted_keys = keys[order]
+        self.sorted_rows = rows[order]
+        self.margin = float(max(half_w[small].max(), half_h[small].max())) if len(rows) else 0.0
+        self.pending = []
+
+    def rebuild(self, cell_size=None):
+        if cell_size is None:
+            cell_size = self.suggest_cell_size(self.bounds[:self.size][self.alive[:self.size]])
+        self.cell_size = cell_size
+        self.build()
+
+    def query(self, bounds):
+        # 경계 상자와 겹치는 행 번호를 오름차순(삽입 순서)으로 반환
+        if len(self.pending) > max(REBUILD_THRESHOLD, self.count // 8):
+            self.build()
+        min_x, min_y, max_x, max_y = bounds
+        size = self.cell_size
+        margin = self.margin
+        cx0 = int(np.floor((min_x - margin) / size))
+        cx1 = int(np.floor((max_x + margin) / size))
+        cy0 = int(np.floor((min_y - margin) / size))
+        cy1 = int(np.floor((max_y + margin) / size))
+        if cx1 - cx0 + 1 > 256:
+            # 질의 영역이 넓으면 전체를 벡터 연산으로 검사하는 편이 빠름
+            candidates = np.flatnonzero(self.alive[:self.size])
+        else:
+            columns = np.arange(cx0, cx1 + 1)
+            starts = np.searchsorted(self.sorted_keys, self.cell_keys(columns, np.full(len(columns), cy0)), 'left')
+            ends = np.searchsorted(self.sorted_keys, self.cell_keys(columns, np.full(len(columns), cy1)), 'right')
+            parts = [self.sorted_rows[start:end] for start, end in zip(starts, ends) if end > start]
+            parts.append(self.large_rows)
+            if self.pending:
+                parts.append(np.array(self.pending, dtype=np.int64))
+            candidates = np.unique(np.concatenate(parts))
+            candidates = candidates[self.alive[candidates]]
+        b = self.bounds[candidates]
+        mask = (b[:, 0] <= max_x) & (b[:, 2] >= min_x) & (b[:, 1] <= max_y) & (b[:, 3] >= min_y)
+        return candidates[mask]
+
+    @staticmethod
+    def suggest_cell_size(bounds, default=100.0):
+        # 전체 범위와 항목 수로부터 셀 하나에 몇 개 정도 들어가도록 크기 추정
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        if len(bounds) == 0:
+            return default
+        width = max(bounds[:, 2].max() - bounds[:, 0].min(), 1.0)
+        height = max(bounds[:, 3].max() - bounds[:, 1].min(), 1.0)
+        typical = float(np.median(np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])))
+        return max(np.sqrt(width * height / len(bounds)) * 2, typical, 1.0)
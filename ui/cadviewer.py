@@ -1,19 +1,144 @@
 # -*- coding: utf-8 -*-
 import ezdxf
 import sys
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from ezdxf.addons.drawing import Frontend, RenderContext
 from ezdxf.addons.drawing.pyqt import PyQtBackend, CorrespondingDXFEntity, CorrespondingDXFParentStack
 from ezdxf.addons.drawing.properties import is_dark_color
 from ezdxf.addons.drawing.qtviewer import CADGraphicsViewWithOverlay
 from ezdxf.lldxf.const import DXFStructureError
 from pathlib import Path
-from PyQt5 import QtWidgets, QtCore, QtGui, QtPrintSupport
+from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtGui import QIcon
+from models.dxf_io import read_document
+from ui.pdf_export import DEFAULT_SETTINGS, write_styled_pdf, apply_print_styles, restore_styles, render_layout
+
+SCENE_CACHE_BYTES = 512 * 1024 * 1024  # 캐시된 씬 전체의 추정 메모리 상한
+SCENE_CACHE_COUNT = 32
+ITEM_BYTES = 400  # 그래픽 항목 하나의 대략적인 고정 비용
+PATH_ELEMENT_BYTES = 24
+THUMBNAIL_SIZE = ( 96, 72 )
+
+def scene_cost(scene):
+    # 항목 수와 경로 꼭짓점 수로 씬의 메모리 사용량을 추정
+    cost = 0
+    for item in scene.items():
+        cost += ITEM_BYTES
+        if hasattr(item, 'path'):
+            cost += item.path().elementCount() * PATH_ELEMENT_BYTES
+        elif hasattr(item, 'polygon'):
+            cost += item.polygon().count() * PATH_ELEMENT_BYTES
+    return cost
+
+def scene_thumbnail(scene):
+    # 도면리스트에 남겨 둘 작은 미리보기 (씬을 버려도 유지)
+    pixmap = QtGui.QPixmap( *THUMBNAIL_SIZE )
+    pixmap.fill( QtCore.Qt.white )
+    painter = QtGui.QPainter(pixmap)
+    scene.render( painter, QtCore.QRectF(pixmap.rect()), scene.sceneRect(), QtCore.Qt.KeepAspectRatio )
+    painter.end()
+    return pixmap
+
+def item_layer(item):
+    # 항목을 만든 DXF 엔티티의 레이어 (블록 안 0 레이어 엔티티는 바깥 INSERT 레이어를 따름)
+    dxf_entity = item.data(CorrespondingDXFEntity)
+    if dxf_entity is None:
+        return None
+    layer = dxf_entity.dxf.layer
+    dxf_parent_stack = item.data(CorrespondingDXFParentStack)
+    if layer == '0' and dxf_parent_stack:
+        for parent in reversed(dxf_parent_stack):
+            layer = parent.dxf.layer
+            if layer != '0':
+                break
+    return layer.lower()
+
+def group_by_layer(scene):
+    # 렌더링된 최상위 항목을 DXF 레이어별 QGraphicsItemGroup 으로 묶어 {레이어명(소문자): 그룹} 반환
+    groups = {}
+    # 항목을 옮기는 동안 BSP 인덱스 갱신을 멈췄다가 마지막에 한 번만 다시 만듦
+    index_method = scene.itemIndexMethod()
+    scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+    for item in scene.items():
+        if item.parentItem() is not None:
+            continue
+        layer = item_layer(item)
+        if layer is None:
+            continue
+        group = groups.get(layer)
+        if group is None:
+            group = QtWidgets.QGraphicsItemGroup()
+            scene.addItem(group)
+            groups[layer] = group
+        item.setParentItem(group)
+    scene.setItemIndexMethod(index_method)
+    return groups
+
+class SceneCache:
+    # draw_layout 결과 씬을 (파일 경로, 배치 이름) 키로 문서와 함께 보관하는 LRU 캐시
+    # 추정 메모리가 max_bytes 를 넘거나 개수가 max_scenes 를 넘으면 가장 오래 쓰지 않은 씬부터 버림
+    # 도면리스트는 경로와 썸네일만 가지므로 버려진 씬(과 문서)은 메모리에서 해제됨
+    def __init__(self, max_bytes=SCENE_CACHE_BYTES, max_scenes=SCENE_CACHE_COUNT):
+        self.max_bytes = max_bytes
+        self.max_scenes = max_scenes
+        self.entries = OrderedDict()  # 키 -> (문서, 씬, 추정 바이트)
+        self.total_bytes = 0
+
+    def key(self, filename, layout_name):
+        # 레이어 표시 여부는 씬의 레이어 그룹으로 처리하므로 키에 넣지 않음
+        return (str(Path(filename)), layout_name)
+
+    def get(self, filename, layout_name):
+        # (문서, 씬) 또는 None
+        key = self.key(filename, layout_name)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[0], entry[1]
+
+    def put(self, filename, layout_name, doc, scene):
+        key = self.key(filename, layout_name)
+        self.pop(key)
+        cost = scene_cost(scene)
+        self.entries[key] = (doc, scene, cost)
+        self.total_bytes += cost
+        # 방금 넣은 씬은 상한을 넘어도 남겨 둠
+        while len(self.entries) > 1 and (self.total_bytes > self.max_bytes or len(self.entries) > self.max_scenes):
+            self.pop(next(iter(self.entries)))
+
+    def pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+    def discard_file(self, filename):
+        for key in [key for key in self.entries if key[0] == str(Path(filename))]:
+            self.pop(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+class ParseNotifier(QtCore.QObject):
+    # 프로세스 풀 완료 콜백(작업 스레드)에서 GUI 스레드로 결과를 넘기는 신호
+    finished = QtCore.pyqtSignal(int, object, str)  # 순번, 문서(실패하면 None), 오류 메시지
 
 class cadViewer(QWidget):
-    def __init__(self, dxf_file=None):
+    def __init__(self, dxf_file=None, scene_budget=SCENE_CACHE_BYTES):
 
         super().__init__()
+        self.scene_cache = SceneCache(scene_budget)  # 열어 둔 도면 씬 전체의 메모리 예산
+        self.filename = None
+        self.parse_pool = None
+        self.parse_notifier = ParseNotifier()
+        self.parse_notifier.finished.connect(self.on_file_parsed)
+        self.open_queue = []  # 선택한 순서대로의 경로
+        self.parsed = {}  # 순번 -> (문서, 오류 메시지), 렌더링하면 제거
+        self.next_open = 0
+        self.pdf_preview = None  # PDF 씬 보기 중인 (씬, 원래 펜/브러시 목록)
         self.viewer = QtViewer()
         layout = QVBoxLayout()
         layout.addWidget(self.viewer)
@@ -37,31 +162,57 @@ class cadViewer(QWidget):
 
         self.view.element_selected.connect(self.selectedInfo.set_elements)
         self.view.mouse_moved.connect(self.on_mouse_moved)
-        self.layers.updated_signal.connect( lambda : self.draw_layout(self.current_layout) )
+        self.layers.updated_signal.connect(self.set_visible_layers)
         self.files.clicked_signal.connect(self.change_drawing)
 
     def load_dxf(self, filename):
         doc = ezdxf.readfile(filename)
         self.viewer.set_document(doc)
 
-    def change_drawing(self, path, scene):
-        self.view.setScene(scene)
-        self.view.fit_to_scene()
-        self.setWindowTitle('도면 뷰어 - ' + str(path))
+    def change_drawing(self, path):
+        self.restore_pdf_scene()
+        entry = self.scene_cache.get(path, 'Model')
+        if entry is None:
+            # 메모리 예산 때문에 버린 도면은 파일을 다시 읽어 그림
+            self.logView.append(f'도면을 다시 여는 중: {path}')
+            self.open_files([ str(path) ])
+            return
+        self.show_document( str(path), entry[0] )
 
     def change_layout(self):
         layout_name = self.sender().text()
         self.draw_layout(layout_name)
 
+    def set_visible_layers(self, visible_names):
+        # 레이어 그룹 표시 여부만 바꿈 (도면을 다시 그리지 않음)
+        scene = self.view.scene()
+        groups = getattr(scene, 'layer_groups', None)
+        if groups is None:
+            return
+        if visible_names is None:
+            # 아직 레이어창을 건드리지 않았으면 도면에 저장된 켜짐/꺼짐 상태(체크 상태)를 따름
+            visible_names = self.layers.checked_names()
+        visible = {name.lower() for name in visible_names}
+        for layer, group in groups.items():
+            group.setVisible(layer in visible)
+
     def draw_layout(self, layout_name):
         self.current_layout = layout_name
+        self.restore_pdf_scene()
+        # 같은 문서/배치를 그린 적이 있으면 Frontend 를 다시 돌리지 않음
+        entry = self.scene_cache.get(self.filename, layout_name)
+        if entry is not None:
+            self.view.setScene(entry[1])
+            self.view.fit_to_scene()
+            self.set_visible_layers(self.layers.visible_names)
+            return
         self.view.begin_loading()
         new_scene = QtWidgets.QGraphicsScene()
         self.backend.set_scene(new_scene)
         layout = self.dxf.layout(layout_name)
         self.render_context.set_current_layout(layout)
-        if self.layers.visible_names is not None:
-            self.render_context.set_layers_state(self.layers.visible_names, state=True)
+        # 꺼진 레이어도 모두 그려 두고 표시 여부는 레이어 그룹으로 조절
+        self.render_context.set_layers_state([layer.layer for layer in self.render_context.layers.values()], state=True)
         try:
             frontend = MyFrontend(self.render_context, self.backend)
             frontend.log_view = self.logView
@@ -72,10 +223,13 @@ class cadViewer(QWidget):
         finally:
             self.backend.finalize()
 
+        new_scene.layer_groups = group_by_layer(new_scene)
         self.view.end_loading(new_scene)
         self.view.buffer_scene_rect()
         self.view.setScene(new_scene)
         self.view.fit_to_scene()
+        self.set_visible_layers(self.layers.visible_names)
+        self.scene_cache.put(self.filename, layout_name, self.dxf, new_scene)
 
     def on_mouse_moved(self, mouse_pos: QtCore.QPointF):
         self.statusLabel.setText( f'mouse position: {mouse_pos.x():.4f}, {mouse_pos.y():.4f}\n' )
@@ -91,55 +245,76 @@ class cadViewer(QWidget):
         if filenames == '':
             return
 
+        # 파일 해석은 프로세스 풀에서 동시에 진행하고, 렌더링은 GUI 스레드에서 선택한 순서대로 진행
+        if self.parse_pool is None:
+            self.parse_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context('spawn'))
         for filename in filenames:
-            self.dxf = ezdxf.readfile(filename)
+            index = len(self.open_queue)
+            self.open_queue.append(filename)
+            future = self.parse_pool.submit(read_document, filename)
+            future.add_done_callback(lambda future, index=index: self.emit_parsed(index, future))
 
-            self.render_context = RenderContext(self.dxf)
-            self.backend = PyQtBackend(use_text_cache=True, params=self.render_params)
-            self.layers.visible_names = None
-            self.current_layout = None
+    def emit_parsed(self, index, future):
+        # 풀 내부 스레드에서 호출되므로 신호로만 GUI 스레드에 알림
+        try:
+            self.parse_notifier.finished.emit(index, future.result(), '')
+        except Exception as e:
+            self.parse_notifier.finished.emit(index, None, str(e))
+
+    def on_file_parsed(self, index, doc, error):
+        self.parsed[index] = (doc, error)
+        if index == self.next_open:
+            QtCore.QTimer.singleShot(0, self.render_next_file)
+
+    def render_next_file(self):
+        # 앞 순번 파일이 끝나야 다음 파일을 그림, 한 번에 한 파일만 그리고 이벤트 루프에 제어를 돌려줌
+        if self.next_open not in self.parsed:
+            return
+        filename = self.open_queue[self.next_open]
+        doc, error = self.parsed.pop(self.next_open)
+        self.next_open += 1
+        if doc is None:
+            self.logView.append(f'도면을 열 수 없습니다: {filename} ({error})')
+        else:
+            # 새로 읽은 문서이므로 같은 파일의 예전 씬은 쓰지 않음
+            self.scene_cache.discard_file(filename)
+            self.show_document(filename, doc)
+        QtCore.QTimer.singleShot(0, self.render_next_file)
 
-            self.select_layout_menu.clear()
-            for layout_name in self.dxf.layout_names_in_taborder():
-                action = self.select_layout_menu.addAction(layout_name)
-                action.triggered.connect(self.change_layout)
+    def show_document(self, filename, doc):
+        self.dxf = doc
+        self.filename = filename
 
-            self.layers.populate_layer_list( self.render_context.layers.values() )
-            self.draw_layout('Model')
-            self.setWindowTitle('도면뷰어 - ' + filename)
+        self.render_context = RenderContext(self.dxf)
+        self.backend = PyQtBackend(use_text_cache=True, params=self.render_params)
+        self.layers.visible_names = None
+        self.current_layout = None
 
-            self.files.append(Path(filename), self.view.scene())
+        self.select_layout_menu.clear()
+        for layout_name in self.dxf.layout_names_in_taborder():
+            action = self.select_layout_menu.addAction(layout_name)
+            action.triggered.connect(self.change_layout)
+
+        self.layers.populate_layer_list( self.render_context.layers.values() )
+        self.draw_layout('Model')
+        self.setWindowTitle('도면뷰어 - ' + filename)
+
+        self.files.append(Path(filename), self.view.scene())
 
     def save_pdfs(self):
         print('start.....save_pdfs..........')
         scene0 = self.view.scene()
-        datas = self.savePdfs.datas(self.savePdfs.model)
-        datas2 = self.savePdfs.datas(self.savePdfs.model2)
+        settings = self.savePdfs.settings()
         if not Path('outputs').exists():
             Path('outputs').mkdir()
         
-        for path, scene in zip(self.files.paths, self.files.scenes):
-
-            print_scene = self.savePdfs.create_scene(scene)
-            self.view.setScene(print_scene)
-
-            image_path = 'outputs/' + path.with_suffix('.pdf').name
-            width, height = int(print_scene.width()), int(print_scene.height())
-            page_size = QtGui.QPageSize(
-                QtCore.QSizeF(width, height),
-                QtGui.QPageSize.Unit.Millimeter
-            )
-
-            printer = QtPrintSupport.QPrinter(QtPrintSupport.QPrinter.HighResolution)
-            printer.setPageSize(page_size)
-            printer.setOutputFormat(QtPrintSupport.QPrinter.PdfFormat)
-            printer.setOutputFileName(image_path)
-            painter = QtGui.QPainter(printer)
-            painter.translate( width*datas['translate']['x'], height*datas['translate']['y'] )
-            painter.scale( datas['scale']['x'], datas['scale']['y'] )
-            painter.rotate(datas2['rotate']['value'])
-            self.view.scene().render(painter)
-            painter.end()
+        self.restore_pdf_scene()
+        # 출력용 씬을 따로 만들지 않고 원본 씬을 출력 규칙(ui.pdf_export)으로 그린 뒤 되돌림
+        for path in self.files.paths:
+            entry = self.scene_cache.get(path, 'Model')
+            # 캐시에서 밀려난 도면은 출력하는 동안만 다시 그리고 버림
+            scene = entry[1] if entry is not None else render_layout( read_document(str(path)), 'Model' )
+            write_styled_pdf( scene, 'outputs/' + path.with_suffix('.pdf').name, settings )
 
         self.view.setScene(scene0)
 
@@ -148,9 +323,24 @@ class cadViewer(QWidget):
         indexes = self.files.view.selectedIndexes()
         if len(indexes) == 0:
             return
-        scene = self.files.scenes[ indexes[0].row() ]
-        pdf_scene = self.savePdfs.create_scene(scene)
-        self.view.setScene(pdf_scene)
+        path = self.files.paths[ indexes[0].row() ]
+        entry = self.scene_cache.get(path, 'Model')
+        if entry is None:
+            # 버려진 씬은 다시 연 뒤에 미리보기
+            self.change_drawing(path)
+            return
+        scene = entry[1]
+        # 원본 씬에 출력 규칙을 씌워 보여 주고, 다른 도면으로 바꿀 때 되돌림
+        self.restore_pdf_scene()
+        self.pdf_preview = ( scene, apply_print_styles(scene, self.savePdfs.settings()) )
+        self.view.setScene(scene)
+
+    def restore_pdf_scene(self):
+        if self.pdf_preview is None:
+            return
+        scene, saved = self.pdf_preview
+        restore_styles(scene, saved)
+        self.pdf_preview = None
 
 class SelectedInfo(QtWidgets.QDockWidget):
     def __init__(self, parent=None):
@@ -221,12 +411,16 @@ class Layers(QtWidgets.QDockWidget):
             item.setBackground( QtGui.QBrush(QtGui.QColor(layer.color)) )
             self.model.appendRow(item)
 
-    def layers_updated(self):
-        self.visible_names = []
+    def checked_names(self):
+        names = []
         for row in range( self.model.rowCount() ):
             item = self.model.item(row, 0)
             if item.checkState() == QtCore.Qt.Checked:
-                self.visible_names.append( item.text() )
+                names.append( item.text() )
+        return names
+
+    def layers_updated(self):
+        self.visible_names = self.checked_names()
         self.updated_signal.emit(self.visible_names)
 
 class LogView(QtWidgets.QDockWidget):
@@ -242,15 +436,16 @@ class LogView(QtWidgets.QDockWidget):
         self.text.append(text)
 
 class Files(QtWidgets.QDockWidget):
-    clicked_signal = QtCore.pyqtSignal( Path, QtWidgets.QGraphicsScene )
+    clicked_signal = QtCore.pyqtSignal( Path )
     def __init__(self, parent=None):
         super(Files, self).__init__(parent)
+        # 씬은 보관하지 않고 경로와 썸네일만 둠 (씬은 cadViewer.scene_cache 가 메모리 예산 안에서 보관)
         self.paths = []
-        self.scenes = []
-        self.print_scenes = []
         self.model = QtGui.QStandardItemModel()
         self.view = QtWidgets.QTableView()
         self.view.setModel(self.model)
+        self.view.setIconSize( QtCore.QSize(*THUMBNAIL_SIZE) )
+        self.view.verticalHeader().setDefaultSectionSize( THUMBNAIL_SIZE[1] + 4 )
         self.setWidget( QtWidgets.QWidget() )
         self.widget().setLayout( QtWidgets.QVBoxLayout() )
         self.widget().layout().addWidget(self.view)
@@ -262,14 +457,16 @@ class Files(QtWidgets.QDockWidget):
 
     def clicked(self, index):
         row = index.row()
-        self.clicked_signal.emit( self.paths[row], self.scenes[row] )
+        self.clicked_signal.emit( self.paths[row] )
 
     def append(self, path, scene):
+        # 이미 있는 도면(다시 연 경우)은 줄을 늘리지 않음
+        if path in self.paths:
+            return
         self.paths.append(path)
-        self.scenes.append(scene)
 
         self.model.appendRow([
-            QtGui.QStandardItem(path.name),
+            QtGui.QStandardItem( QtGui.QIcon(scene_thumbnail(scene)), path.name ),
             QtGui.QStandardItem( str( round(scene.width(),  3) ) ),
             QtGui.QStandardItem( str( round(scene.height(), 3) ) )
         ])
@@ -295,65 +492,25 @@ class SavePdfs(QtWidgets.QDockWidget):
 
         self.model.setHorizontalHeaderLabels(['x', 'y'])
         self.model.setVerticalHeaderLabels(['translate', 'scale'])
-        for row, row_data in enumerate([ [0.0, 46.65], [1.0, -1.0] ]):
+        for row, row_data in enumerate([ DEFAULT_SETTINGS['translate'], DEFAULT_SETTINGS['scale'] ]):
             for column, data in enumerate(row_data):
                 self.model.setData(self.model.index(row, column), data)
 
         self.model2.setHorizontalHeaderLabels(['value'])
         self.model2.setVerticalHeaderLabels(['rotate', 'thin line width', 'thick line width'])
-        for row, data in enumerate([0.0, 0.4, 1.2]):
+        for row, data in enumerate([ DEFAULT_SETTINGS['rotate'], DEFAULT_SETTINGS['thin_width'], DEFAULT_SETTINGS['thick_width'] ]):
             self.model2.setData(self.model2.index(row, 0), data)
 
-    def create_scene(self, scene):
-        new_scene = QtWidgets.QGraphicsScene( scene.sceneRect() )
-        brush = QtGui.QBrush( QtGui.QColor('#000000') )
-        data2 = self.datas(self.model2)
-        pen = QtGui.QPen( brush, 0 )
-        thin_pen = QtGui.QPen( brush, data2['thin line width']['value'] )
-        thick_pen = QtGui.QPen( brush, data2['thick line width']['value'] )
-
-        for item in scene.items():
-
-            dxf_entity = item.data(CorrespondingDXFEntity)
-            dxf_parent_stack = item.data(CorrespondingDXFParentStack)
-            copied = type(item)()
-
-            if type(copied) is QtWidgets.QGraphicsPathItem:
-                copied.setPath( item.path() )
-
-            if type(copied) is QtWidgets.QGraphicsLineItem:
-                copied.setLine( item.line() )
-
-            if type(copied) is QtWidgets.QGraphicsPolygonItem:
-                copied.setPolygon( item.polygon() )
-
-            if type(copied) is ezdxf.addons.drawing.pyqt._Point:
-                copied.pos = item.pos
-
-            if type(copied) is ezdxf.addons.drawing.pyqt._CosmeticPath:
-                copied.setPath( item.path() )
-
-            if type(copied) is ezdxf.addons.drawing.pyqt._CosmeticPolygon:
-                copied.setPolygon( item.polygon() )
-
-
-            if type(dxf_entity) is ezdxf.entities.mtext.MText or type(dxf_entity) is ezdxf.entities.text.Text:
-                copied.setBrush(brush)
-                copied.setPen(pen)
-            else:
-                copied.setPen(thick_pen)
-
-                if not dxf_parent_stack is None:
-                    if ezdxf.entities.dimension.Dimension in [ type(p) for p in dxf_parent_stack ]:
-                        copied.setPen(thin_pen)
-
-                if type(dxf_entity) is ezdxf.entities.line.Line:
-                    if dxf_entity.dxf.linetype == 'CENTER':
-                        copied.setPen(thin_pen)
-
-            new_scene.addItem(copied)
-
-        return new_scene
+    def settings(self):
+        # 표 값을 ui.pdf_export 출력 설정 형식으로 변환 (일괄 출력 CLI 와 같은 설정)
+        datas = self.datas(self.model)
+        datas2 = self.datas(self.model2)
+        return dict(DEFAULT_SETTINGS,
+                    translate=( datas['translate']['x'], datas['translate']['y'] ),
+                    scale=( datas['scale']['x'], datas['scale']['y'] ),
+                    rotate=datas2['rotate']['value'],
+                    thin_width=datas2['thin line width']['value'],
+                    thick_width=datas2['thick line width']['value'])
 
     def datas(self, model):
         datas = {}
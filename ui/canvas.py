@@ -1,64 +1,305 @@
 # ui/canvas.py
 
-from PyQt5.QtWidgets import QWidget, QInputDialog, QFileDialog, QMessageBox
-from PyQt5.QtGui import QPainter, QPen
-from PyQt5.QtCore import Qt, QPointF, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QWidget, QInputDialog, QFileDialog, QMessageBox, QProgressDialog
+from PyQt5.QtGui import QPainter, QPen, QPixmap, QColor, QPolygonF
+from PyQt5.QtCore import Qt, QPointF, QLineF, QRectF, pyqtSignal
 from models.shapes import Shape, LineShape, CircleShape, RectangleShape
 from models.ifc_model import IFCModel
-import ezdxf
-import geopandas as gpd
+from models.spatial_index import GridIndex
+from models.geometry_store import GeometryStore, rows_bounds
+from models.blocks import InsertStore
+from models import dxf_io, geometry_cache
+from models.dxf_io import iter_dxf_batches
+from models.selection import hit_mask, window_mask, crossing_mask, lasso_mask
+from ui.layer_renderer import draw_rows_batched, draw_layer_lod, draw_layer_inserts, use_lod
+from ui.profiler import RenderProfiler
+from ui.dxf_worker import DxfLoadWorker, DxfSaveWorker, start_worker
+from ui.parcel_worker import ParcelAnalysisWorker, STAGES as PARCEL_STAGES
+from models import parcel_report
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Border, Side
 from shapely.geometry import shape as shapely_shape, mapping
 from shapely.ops import unary_union
 from network.logger import log_info, log_error
+import math
+import os
+
+HIT_TOLERANCE = 5.0  # Shape.contains 판정 거리와 동일
+GRID_SIZE = 20
+DRAG_THRESHOLD = 4  # 이 픽셀 이상 끌면 클릭 대신 영역 선택
+MAX_GRID_LINES = 100  # 축마다 그릴 격자선 최대 개수
+STREAMING_THRESHOLD = 50 * 1024 * 1024  # 이보다 큰 DXF는 스트리밍으로 불러옴
+LAYER_CACHE_LIMIT = 4  # 따로 픽스맵을 두는 최근 편집 레이어 수, 나머지는 사이사이 구간별로 합쳐 그림
 
 class Canvas(QWidget):
     position_changed = pyqtSignal(QPointF)
     shape_selected = pyqtSignal(object)
+    shapes_selected = pyqtSignal(list)
+    layers_changed = pyqtSignal()
 
     def __init__(self):
         super().__init__()
-        self.shapes = []
         self.current_shape = None
         self.mode = 'select'
         self.scale = 1.0
         self.offset = QPointF(0, 0)
-        self.layers = {'Default': {'color': Qt.black, 'shapes': [], 'hatch': Qt.NoBrush}}
+        self.layers = {'Default': self.create_layer('Default')}
+        self.blocks = {}  # 블록 이름 -> Block (모든 레이어의 참조가 공유)
         self.current_layer = 'Default'
         self.selected_shape = None
+        self.selection = {}  # 레이어명 -> 선택된 저장소 행 번호 배열
+        self.drag_origin = None  # 영역 선택 시작점 (화면 좌표)
+        self.drag_points = []  # 영역/올가미 선택 중 지나온 화면 좌표
+        self.grid_cache = None
+        self.grid_cache_key = None
+        self.scene_cache = None  # 격자와 레이어를 합성한 정적 장면 (backing store)
+        self.scene_cache_key = None
+        self.hot_layers = []  # 최근에 바뀐 레이어 이름 (오래된 것부터, 최대 LAYER_CACHE_LIMIT 개)
+        self.run_caches = {}  # 합쳐 그린 레이어 구간 (레이어 이름 튜플) -> (화면 상태, 픽스맵)
+        self.profiler = RenderProfiler()
+        self.io_worker = None  # 백그라운드 DXF 불러오기/저장 작업
+        self.io_thread = None
+        self.io_filename = None
+        self.io_started = None  # 프로파일러 dxf_load 시작 시각
+        self.parcel_worker = None  # 백그라운드 파셀 분석 작업
+        self.parcel_thread = None
+        self.parcel_dialog = None
         self.init_ui()
 
+    def create_layer(self, layer_name, color=Qt.black, hatch=Qt.NoBrush):
+        # 도형은 열 단위 저장소에, 경계 상자는 같은 행 번호로 공간 인덱스에 보관
+        # inserts: 블록 참조(INSERT), 경계 상자는 insert_index 에 같은 행 번호로 보관
+        # cache: 현재 화면 상태로 그려 둔 레이어 픽스맵 (최근 편집 레이어만), dirty: 도형/스타일이 바뀌어 다시 그려야 함
+        return {'color': color, 'shapes': GeometryStore(layer_name), 'hatch': hatch, 'index': GridIndex(),
+                'inserts': InsertStore(), 'insert_index': GridIndex(),
+                'cache': None, 'cache_key': None, 'dirty': True}
+
+    def add_layer(self, layer_name, color=Qt.black):
+        if layer_name not in self.layers:
+            self.layers[layer_name] = self.create_layer(layer_name, color)
+            self.layers_changed.emit()
+        return self.layers[layer_name]
+
+    def remove_layer(self, layer_name):
+        layer = self.layers.pop(layer_name, None)
+        if layer is None:
+            return
+        if self.selected_shape is not None and getattr(self.selected_shape, 'store', None) is layer['shapes']:
+            self.selected_shape = None
+            self.shape_selected.emit(None)
+        self.selection.pop(layer_name, None)
+        if self.current_layer == layer_name:
+            self.current_layer = 'Default'
+        self.scene_cache = None
+        self.layers_changed.emit()
+        self.update()
+
+    def add_shape(self, shape, layer_name=None):
+        # 저장소에 추가하고 저장소 행을 가리키는 뷰를 반환
+        if layer_name is None:
+            layer_name = self.current_layer
+        layer = self.layers[layer_name]
+        stored = layer['shapes'].append(shape)
+        layer['index'].insert(stored.row, stored.bounds())
+        layer['dirty'] = True
+        return stored
+
+    def add_shape_rows(self, layer_name, kinds, coords, adopt=False):
+        # DXF 불러오기 등 대량 추가용: 배열 묶음을 저장소와 인덱스에 한 번에 반영
+        # adopt=True 이면 빈 저장소가 배열을 복사하지 않고 그대로 씀 (도형 캐시의 메모리 매핑 배열)
+        layer = self.layers[layer_name]
+        rows = layer['shapes'].extend(kinds, coords, adopt)
+        layer['index'].insert_many(rows, rows_bounds(layer['shapes'].kinds[rows], layer['shapes'].coords[rows]))
+        layer['dirty'] = True
+
+    def add_insert_rows(self, layer_name, names, transforms):
+        # 블록 참조 묶음 추가, 경계 상자는 블록 범위를 참조 변환으로 옮겨 계산
+        layer = self.layers[layer_name]
+        rows = layer['inserts'].extend(names, transforms)
+        layer['insert_index'].insert_many(rows, layer['inserts'].bounds(self.blocks, rows))
+        layer['dirty'] = True
+
+    def rotate_shape(self, shape, angle, center_point=None):
+        shape.rotate(angle, center_point)
+        layer = self.layers.get(getattr(shape, 'layer_name', None))
+        if layer is not None and getattr(shape, 'store', None) is layer['shapes']:
+            layer['index'].update(shape.row, shape.bounds())
+            layer['dirty'] = True
+        self.update()
+
+    def mark_layer_dirty(self, layer_name):
+        # 스타일 변경 등으로 해당 레이어 캐시만 다시 그리도록 표시
+        self.layers[layer_name]['dirty'] = True
+        self.update()
+
+    def all_shapes(self):
+        for layer in self.layers.values():
+            yield from layer['shapes']
+
     def init_ui(self):
         self.setMouseTracking(True)
 
+    def set_mode(self, mode):
+        # 그리던 도형과 진행 중인 영역 선택은 버리고 모드 전환
+        self.mode = mode
+        self.current_shape = None
+        self.drag_origin = None
+        self.drag_points = []
+        self.update()
+
+    def set_profiling(self, enabled):
+        self.profiler.enabled = enabled
+        self.update()
+
     def paintEvent(self, event):
+        self.profiler.begin_frame()
         painter = QPainter(self)
+        # 정적 장면은 backing store에서 갱신 영역만 복사하고, 미리보기/선택 도형만 그 위에 그림
+        key = self.view_key()
+        if (self.scene_cache is None or self.scene_cache_key != key
+                or any(layer['dirty'] for layer in self.layers.values())):
+            with self.profiler.measure('scene'):
+                self.scene_cache = self.render_scene()
+            self.scene_cache_key = key
+        rect = event.rect()
+        painter.drawPixmap(rect, self.scene_cache, rect)
         painter.scale(self.scale, self.scale)
         painter.translate(self.offset)
-        self.draw_grid(painter)
-        for layer_name, layer in self.layers.items():
-            for shape in layer['shapes']:
-                self.draw_shape(painter, shape, layer)
         if self.current_shape:
             pen = QPen(Qt.red, 2 / self.scale, Qt.DashLine)
             painter.setPen(pen)
             self.current_shape.draw(painter)
+        if self.selection:
+            pen = QPen(Qt.blue, 2 / self.scale, Qt.DashLine)
+            for layer_name, rows in self.selection.items():
+                draw_rows_batched(painter, self.layers[layer_name], rows, self.scale, pen, Qt.NoBrush)
         if self.selected_shape:
             pen = QPen(Qt.blue, 2 / self.scale, Qt.DashLine)
             painter.setPen(pen)
             self.selected_shape.draw(painter)
-
-    def draw_shape(self, painter, shape, layer):
-        pen = QPen(layer['color'], 2 / self.scale)
-        painter.setPen(pen)
-        if 'hatch' in layer:
-            brush = Qt.NoBrush if layer['hatch'] == Qt.NoBrush else Qt.BrushStyle(layer['hatch'])
-            painter.setBrush(brush)
-        else:
-            painter.setBrush(Qt.NoBrush)
-        shape.draw(painter)
+        if self.drag_origin is not None and len(self.drag_points) > 1:
+            painter.resetTransform()
+            self.draw_selection_outline(painter)
+        self.profiler.end_frame()
+        if self.profiler.enabled:
+            self.profiler.draw_overlay(painter)
+
+    def view_key(self):
+        return (self.scale, self.offset.x(), self.offset.y(), self.width(), self.height())
+
+    def render_scene(self):
+        # 최근 편집 레이어는 각자의 픽스맵을, 그 사이의 나머지 레이어는 구간마다 하나로 합친 픽스맵을 캐시해
+        # 레이어 순서대로 합성 (레이어가 많아도 보관하는 픽스맵은 2 * LAYER_CACHE_LIMIT + 1 개 이하)
+        pixmap = QPixmap(max(self.width(), 1), max(self.height(), 1))
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        with self.profiler.measure('grid'):
+            self.draw_grid(painter)
+        key = self.view_key()
+        self.update_hot_layers()
+        run_caches = {}
+        for segment in self.layer_segments():
+            if isinstance(segment, tuple):
+                cached = self.run_caches.get(segment)
+                if cached is None or cached[0] != key or any(self.layers[name]['dirty'] for name in segment):
+                    cached = (key, self.render_layers([self.layers[name] for name in segment]))
+                run_caches[segment] = cached
+                layer_pixmap = cached[1]
+            else:
+                layer = self.layers[segment]
+                if layer['dirty'] or layer['cache_key'] != key:
+                    layer['cache'] = self.render_layers([layer])
+                    layer['cache_key'] = key
+                    layer['dirty'] = False
+                layer_pixmap = layer['cache']
+            if layer_pixmap is not None:
+                painter.drawPixmap(0, 0, layer_pixmap)
+        self.run_caches = run_caches
+        painter.end()
+        return pixmap
+
+    def update_hot_layers(self):
+        # 바뀐 레이어를 최근 편집 목록 끝으로 옮기고, 목록에서 밀려난 레이어의 픽스맵은 버림
+        hot = [name for name in self.hot_layers if name in self.layers]
+        for name, layer in self.layers.items():
+            if layer['dirty']:
+                if name in hot:
+                    hot.remove(name)
+                hot.append(name)
+        self.hot_layers = hot[-LAYER_CACHE_LIMIT:]
+        for name, layer in self.layers.items():
+            if name not in self.hot_layers:
+                layer['cache'] = None
+                layer['cache_key'] = None
+
+    def layer_segments(self):
+        # 레이어 순서대로 최근 편집 레이어는 이름 하나, 그 사이 나머지 레이어는 이름 튜플 하나로 나눔
+        segments = []
+        run = []
+        for name in self.layers:
+            if name in self.hot_layers:
+                if run:
+                    segments.append(tuple(run))
+                    run = []
+                segments.append(name)
+            else:
+                run.append(name)
+        if run:
+            segments.append(tuple(run))
+        return segments
+
+    def shape_device_rect(self, shape):
+        # 도형 경계 상자를 화면 좌표로 옮기고 펜 두께만큼 넓힌 갱신 영역
+        min_x, min_y, max_x, max_y = shape.bounds()
+        rect = QRectF((min_x + self.offset.x()) * self.scale, (min_y + self.offset.y()) * self.scale,
+                      (max_x - min_x) * self.scale, (max_y - min_y) * self.scale)
+        return rect.adjusted(-4, -4, 4, 4).toAlignedRect()
+
+    def render_layers(self, layers):
+        # 레이어들을 순서대로 픽스맵 하나에 그림, 화면 밖 도형은 공간 인덱스 질의 단계에서 제외
+        # 보이는 도형이 없으면 픽스맵도 만들지 않음
+        view = self.visible_bounds()
+        pixmap = None
+        painter = None
+        for layer in layers:
+            self.profiler.count('layers_rendered', 1)
+            layer['dirty'] = False
+            # 많이 축소된 큰 레이어는 LOD 요약(점 + 큰 도형)으로 그림
+            rows = None
+            if not use_lod(layer, self.scale):
+                rows = layer['index'].query(view)
+                self.profiler.count('shapes_drawn', len(rows))
+                self.profiler.count('shapes_culled', len(layer['shapes']) - len(rows))
+            insert_rows = layer['insert_index'].query(view) if len(layer['inserts']) else []
+            if rows is not None and len(rows) == 0 and len(insert_rows) == 0:
+                continue
+            if painter is None:
+                pixmap = QPixmap(max(self.width(), 1), max(self.height(), 1))
+                pixmap.fill(Qt.transparent)
+                painter = QPainter(pixmap)
+                painter.scale(self.scale, self.scale)
+                painter.translate(self.offset)
+            if rows is None:
+                drawn, points = draw_layer_lod(painter, layer, view, self.scale)
+                self.profiler.count('shapes_drawn', drawn)
+                self.profiler.count('lod_points', points)
+                self.profiler.count('shapes_culled', len(layer['shapes']) - drawn)
+            elif len(rows):
+                draw_rows_batched(painter, layer, rows, self.scale)
+            if len(insert_rows):
+                drawn, points = draw_layer_inserts(painter, layer, insert_rows, self.blocks, self.scale)
+                self.profiler.count('inserts_drawn', drawn)
+                self.profiler.count('lod_points', points)
+        if painter is not None:
+            painter.end()
+        return pixmap
+
+    def visible_bounds(self):
+        # 현재 scale/offset과 위젯 크기로부터 보이는 장면 영역 계산 (펜 두께만큼 여유)
+        top_left = self.map_to_scene(QPointF(0, 0))
+        bottom_right = self.map_to_scene(QPointF(self.width(), self.height()))
+        margin = 2 / self.scale
+        return (top_left.x() - margin, top_left.y() - margin,
+                bottom_right.x() + margin, bottom_right.y() + margin)
 
     def mousePressEvent(self, event):
         pos = self.map_to_scene(event.pos())
@@ -71,9 +312,14 @@ class Canvas(QWidget):
             elif self.mode == 'rectangle':
                 self.current_shape = RectangleShape(pos)
             elif self.mode == 'select':
-                self.selected_shape = self.get_shape_at_position(pos)
+                self.selection = {}
+                with self.profiler.event('hit_test'):
+                    self.selected_shape = self.get_shape_at_position(pos)
                 self.shape_selected.emit(self.selected_shape)
                 self.update()
+            if self.mode in ('select', 'lasso'):
+                self.drag_origin = QPointF(event.pos())
+                self.drag_points = [QPointF(event.pos())]
             # 기타 모드 처리
             self.update()
 
@@ -82,79 +328,294 @@ class Canvas(QWidget):
         pos = self.snap_to_grid(pos)
         self.position_changed.emit(pos)
         if self.current_shape:
+            # 이전/새 미리보기 영역의 합집합만 다시 그림
+            old_rect = self.shape_device_rect(self.current_shape)
             self.current_shape.update(pos)
+            self.update(old_rect.united(self.shape_device_rect(self.current_shape)))
+        elif self.drag_origin is not None:
+            if self.mode == 'lasso':
+                self.drag_points.append(QPointF(event.pos()))
+            else:
+                self.drag_points = [self.drag_origin, QPointF(event.pos())]
             self.update()
 
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.LeftButton and self.current_shape:
-            self.layers[self.current_layer]['shapes'].append(self.current_shape)
+            self.add_shape(self.current_shape)
             self.current_shape = None
             self.update()
+        elif event.button() == Qt.LeftButton and self.drag_origin is not None:
+            self.finish_drag_selection(QPointF(event.pos()))
+
+    def finish_drag_selection(self, end):
+        origin = self.drag_origin
+        points = self.drag_points
+        self.drag_origin = None
+        self.drag_points = []
+        if (end - origin).manhattanLength() < DRAG_THRESHOLD:
+            self.update()
+            return
+        with self.profiler.event('selection', mode=self.mode):
+            if self.mode == 'lasso':
+                polygon = [self.map_to_scene(point) for point in points + [end]]
+                selection = self.select_in_lasso([(p.x(), p.y()) for p in polygon])
+            else:
+                # 오른쪽으로 끌면 윈도우, 왼쪽으로 끌면 걸침 선택
+                a = self.map_to_scene(origin)
+                b = self.map_to_scene(end)
+                rect = (min(a.x(), b.x()), min(a.y(), b.y()), max(a.x(), b.x()), max(a.y(), b.y()))
+                selection = self.select_in_rect(rect, crossing=end.x() < origin.x())
+        self.set_selection(selection)
+
+    def draw_selection_outline(self, painter):
+        painter.setBrush(QColor(0, 120, 215, 40))
+        if self.mode == 'lasso':
+            painter.setPen(QPen(Qt.blue, 1, Qt.DashLine))
+            painter.drawPolygon(QPolygonF(self.drag_points))
+        else:
+            origin, end = self.drag_points[0], self.drag_points[-1]
+            crossing = end.x() < origin.x()
+            painter.setPen(QPen(Qt.darkGreen if crossing else Qt.blue, 1, Qt.DashLine if crossing else Qt.SolidLine))
+            painter.drawRect(QRectF(origin, end).normalized())
+
+    def set_selection(self, selection):
+        self.selection = {name: rows for name, rows in selection.items() if len(rows)}
+        shapes = self.selected_shapes()
+        self.selected_shape = shapes[0] if len(shapes) == 1 else None
+        self.shape_selected.emit(self.selected_shape)
+        self.shapes_selected.emit(shapes)
+        self.update()
+
+    def selected_shapes(self):
+        shapes = []
+        for layer_name, rows in self.selection.items():
+            store = self.layers[layer_name]['shapes']
+            shapes.extend(store[row] for row in rows.tolist())
+        return shapes
+
+    def select_rows(self, query, mask_function):
+        # 공간 인덱스로 후보를 추린 뒤 레이어 단위로 벡터 판정
+        selection = {}
+        for layer_name, layer in self.layers.items():
+            rows = layer['index'].query(query)
+            if len(rows) == 0:
+                continue
+            store = layer['shapes']
+            selection[layer_name] = rows[mask_function(store.kinds[rows], store.coords[rows])]
+        return selection
+
+    def select_in_rect(self, rect, crossing=False):
+        if crossing:
+            return self.select_rows(rect, lambda kinds, coords: crossing_mask(kinds, coords, rect))
+        return self.select_rows(rect, lambda kinds, coords: window_mask(kinds, coords, rect))
+
+    def select_in_lasso(self, polygon):
+        xs = [x for x, _ in polygon]
+        ys = [y for _, y in polygon]
+        query = (min(xs), min(ys), max(xs), max(ys))
+        return self.select_rows(query, lambda kinds, coords: lasso_mask(kinds, coords, polygon))
 
     def map_to_scene(self, pos):
         return (pos / self.scale) - self.offset
 
     def snap_to_grid(self, pos):
-        grid_size = 20
+        grid_size = GRID_SIZE
         x = round(pos.x() / grid_size) * grid_size
         y = round(pos.y() / grid_size) * grid_size
         return QPointF(x, y)
 
     def draw_grid(self, painter):
-        pen = QPen(Qt.lightGray, 1 / self.scale)
-        painter.setPen(pen)
-        grid_size = 20
-        left = int(-self.offset.x() / self.scale) - 1000
-        top = int(-self.offset.y() / self.scale) - 1000
-        right = int(left + self.width() / self.scale) + 2000
-        bottom = int(top + self.height() / self.scale) + 2000
-        for x in range(left, right, grid_size):
-            painter.drawLine(x, top, x, bottom)
-        for y in range(top, bottom, grid_size):
-            painter.drawLine(left, y, right, y)
+        # 격자는 화면 좌표계의 픽스맵으로 캐시하고 scale/offset/크기가 바뀔 때만 다시 생성
+        key = self.view_key()
+        if self.grid_cache is None or self.grid_cache_key != key:
+            self.grid_cache = self.render_grid()
+            self.grid_cache_key = key
+        painter.drawPixmap(0, 0, self.grid_cache)
+
+    def grid_spacing(self):
+        # 축마다 MAX_GRID_LINES 개를 넘지 않도록 확대 수준에 맞춰 간격을 두 배씩 늘림
+        spacing = GRID_SIZE
+        extent = max(self.width(), self.height()) / self.scale
+        while extent / spacing > MAX_GRID_LINES:
+            spacing *= 2
+        return spacing
+
+    def render_grid(self):
+        pixmap = QPixmap(max(self.width(), 1), max(self.height(), 1))
+        pixmap.fill(Qt.transparent)
+        spacing = self.grid_spacing()
+        top_left = self.map_to_scene(QPointF(0, 0))
+        bottom_right = self.map_to_scene(QPointF(self.width(), self.height()))
+        lines = []
+        x = math.ceil(top_left.x() / spacing) * spacing
+        while x <= bottom_right.x():
+            device_x = (x + self.offset.x()) * self.scale
+            lines.append(QLineF(device_x, 0, device_x, self.height()))
+            x += spacing
+        y = math.ceil(top_left.y() / spacing) * spacing
+        while y <= bottom_right.y():
+            device_y = (y + self.offset.y()) * self.scale
+            lines.append(QLineF(0, device_y, self.width(), device_y))
+            y += spacing
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(Qt.lightGray, 1))
+        painter.drawLines(lines)
+        painter.end()
+        return pixmap
+
+    def reset_document(self):
+        self.layers = {'Default': self.create_layer('Default')}
+        self.blocks = {}  # 블록 이름 -> Block (모든 레이어의 참조가 공유)
+        self.current_layer = 'Default'
+        self.selected_shape = None
+        self.selection = {}
+        self.scene_cache = None
 
     def new_file(self):
-        self.shapes.clear()
-        self.layers = {'Default': {'color': Qt.black, 'shapes': [], 'hatch': Qt.NoBrush}}
-        self.current_layer = 'Default'
+        self.reset_document()
+        self.layers_changed.emit()
         self.update()
 
-    def open_dxf(self, filename):
+    def add_batch(self, batch):
+        # dxf_io 묶음 ({'blocks', 'shapes', 'inserts'}) 을 반영, 새 레이어가 생기면 True
+        # 도형 캐시에서 읽은 묶음('mapped')은 메모리 매핑 배열을 복사하지 않고 저장소로 씀
+        self.blocks.update(batch.get('blocks', {}))
+        created = False
+        for key in ('shapes', 'inserts'):
+            for layer_name, (values, arrays) in batch.get(key, {}).items():
+                if layer_name not in self.layers:
+                    self.layers[layer_name] = self.create_layer(layer_name)
+                    created = True
+                if key == 'shapes':
+                    self.add_shape_rows(layer_name, values, arrays, batch.get('mapped', False))
+                else:
+                    self.add_insert_rows(layer_name, values, arrays)
+        return created
+
+    def document_batch(self):
+        # 현재 문서 전체를 불러오기 묶음과 같은 형식으로 (캐시 저장용)
+        return {
+            'blocks': self.blocks,
+            'shapes': {name: (layer['shapes'].kinds[:len(layer['shapes'])], layer['shapes'].coords[:len(layer['shapes'])])
+                       for name, layer in self.layers.items()},
+            'inserts': {name: ([layer['inserts'].block_name(row) for row in range(layer['inserts'].count)],
+                               layer['inserts'].transforms[:layer['inserts'].count])
+                        for name, layer in self.layers.items() if len(layer['inserts'])},
+        }
+
+    def rebuild_indexes(self):
+        # 도면 범위에 맞춰 인덱스 셀 크기 재조정
+        for layer in self.layers.values():
+            layer['index'].rebuild()
+            layer['insert_index'].rebuild()
+
+    def open_dxf(self, filename, streaming=None):
+        # 큰 파일은 iterdxf 로 문서 전체를 올리지 않고 묶음 단위로 변환하며 캔버스에 바로 표시
+        if streaming is None:
+            streaming = os.path.getsize(filename) >= STREAMING_THRESHOLD
         try:
-            doc = ezdxf.readfile(filename)
-            msp = doc.modelspace()
-            self.shapes.clear()
-            for entity in msp:
-                if entity.dxftype() == 'LINE':
-                    start = entity.dxf.start
-                    end = entity.dxf.end
-                    shape = LineShape(QPointF(start[0], start[1]), QPointF(end[0], end[1]))
-                    self.shapes.append(shape)
-                elif entity.dxftype() == 'CIRCLE':
-                    center = entity.dxf.center
-                    radius = entity.dxf.radius
-                    shape = CircleShape(QPointF(center[0], center[1]), radius)
-                    self.shapes.append(shape)
-                # 기타 엔티티 처리
-            self.update()
+            with self.profiler.event('dxf_load', filename=filename, streaming=streaming):
+                self.reset_document()
+                cached = geometry_cache.load(filename)
+                batches = [cached] if cached is not None else iter_dxf_batches(filename, streaming)
+                for batch in batches:
+                    created = self.add_batch(batch)
+                    if streaming:
+                        if created:
+                            self.layers_changed.emit()
+                        self.update()
+                        QApplication.processEvents()
+                self.rebuild_indexes()
+                self.layers_changed.emit()
+                self.update()
+            if cached is None:
+                self.save_geometry_cache(filename)
             log_info(f'DXF 파일을 열었습니다: {filename}')
         except Exception as e:
             log_error(f'파일 열기 중 오류 발생: {e}')
 
     def save_dxf(self, filename):
         try:
-            doc = ezdxf.new(dxfversion='R2010')
-            msp = doc.modelspace()
-            for layer_name, layer_data in self.layers.items():
-                doc.layers.add(name=layer_name)
-                for shape in layer_data['shapes']:
-                    shape.add_to_dxf(msp, layer_name)
-            doc.saveas(filename)
+            dxf_io.save_dxf(filename, {name: layer['shapes'] for name, layer in self.layers.items()},
+                            inserts={name: layer['inserts'] for name, layer in self.layers.items()},
+                            blocks=self.blocks)
             print(f'DXF 파일로 저장되었습니다: {filename}')
             log_info(f'DXF 파일로 저장되었습니다: {filename}')
         except Exception as e:
             log_error(f'파일 저장 중 오류 발생: {e}')
 
+    def save_geometry_cache(self, filename):
+        # 다시 열 때 변환을 건너뛰도록 방금 불러온 레이어 배열을 캐시에 기록 (실패해도 불러오기는 유지)
+        try:
+            geometry_cache.save(filename, self.document_batch())
+        except Exception as e:
+            log_error(f'도형 캐시 저장 중 오류 발생: {e}')
+
+    def is_busy(self):
+        return self.io_thread is not None and self.io_thread.isRunning()
+
+    def start_open_dxf(self, filename, streaming=None):
+        # 작업 스레드에서 변환하고 묶음이 도착할 때마다 GUI 스레드에서 레이어에 추가
+        if streaming is None:
+            streaming = os.path.getsize(filename) >= STREAMING_THRESHOLD
+        self.reset_document()
+        self.layers_changed.emit()
+        self.update()
+        self.io_started = self.profiler.start_event()
+        worker = DxfLoadWorker(filename, streaming)
+        worker.batch_ready.connect(self.on_batch_loaded)
+        worker.finished.connect(self.on_load_finished)
+        worker.failed.connect(self.on_io_failed)
+        self.io_filename = filename
+        self.io_worker = worker
+        self.io_thread = start_worker(worker)
+        return worker
+
+    def start_save_dxf(self, filename):
+        # 저장 중 편집과 겹치지 않도록 레이어 저장소를 복사해 넘김
+        stores = {name: layer['shapes'].copy() for name, layer in self.layers.items()}
+        inserts = {name: layer['inserts'].copy() for name, layer in self.layers.items()}
+        worker = DxfSaveWorker(filename, stores, inserts, dict(self.blocks))
+        worker.finished.connect(self.on_save_finished)
+        worker.failed.connect(self.on_io_failed)
+        self.io_filename = filename
+        self.io_worker = worker
+        self.io_thread = start_worker(worker)
+        return worker
+
+    def on_batch_loaded(self, batch):
+        if self.add_batch(batch):
+            self.layers_changed.emit()
+        self.update()
+
+    def on_load_finished(self, completed):
+        if not completed:
+            self.end_load_event(completed)
+            self.reset_document()
+            self.layers_changed.emit()
+            self.update()
+            log_info(f'DXF 파일 열기를 취소했습니다: {self.io_filename}')
+            return
+        self.rebuild_indexes()
+        self.update()
+        self.end_load_event(completed)
+        log_info(f'DXF 파일을 열었습니다: {self.io_filename}')
+
+    def end_load_event(self, completed):
+        # start_open_dxf 부터 인덱스 재구성까지 (open_dxf 의 dxf_load 와 같은 구간)
+        self.profiler.end_event('dxf_load', self.io_started, filename=self.io_filename,
+                                streaming=self.io_worker.streaming, completed=completed)
+        self.io_started = None
+
+    def on_save_finished(self, completed):
+        if completed:
+            log_info(f'DXF 파일로 저장되었습니다: {self.io_filename}')
+        else:
+            log_info(f'DXF 파일 저장을 취소했습니다: {self.io_filename}')
+
+    def on_io_failed(self, message):
+        log_error(f'DXF 파일 처리 중 오류 발생: {message}')
+
     def open_ifc(self, filename):
         self.ifc_model = IFCModel(filename)
         elements = self.ifc_model.get_elements()
@@ -169,19 +630,24 @@ class Canvas(QWidget):
         sf_manager = ShapefileManager(filename)
         # 필드 생성
         fields = [('Layer', 'C', 50)]
-        if self.shapes:
-            sample_shape = self.shapes[0]
-            for attr_name in sample_shape.attributes.keys():
+        stores = [layer['shapes'] for layer in self.layers.values() if len(layer['shapes'])]
+        if stores:
+            sample_attributes = stores[0].attributes.get(0, {})
+            for attr_name in sample_attributes.keys():
                 fields.append((attr_name, 'C', 50))
             sf_manager.create_fields(fields)
-            # 도형과 속성 추가
-            for shape in self.shapes:
-                geometry = shape.to_geometry()
-                attributes = [shape.layer_name] + list(shape.attributes.values())
-                sf_manager.add_record(geometry, attributes)
+            # 도형과 속성 추가 (좌표는 저장소 배열에서 일괄 변환)
+            for store in stores:
+                for row, geometry in enumerate(store.to_geometries()):
+                    attributes = [store.layer_name] + list(store.attributes.get(row, {}).values())
+                    sf_manager.add_record(geometry, attributes)
             sf_manager.save()
 
     def perform_parcel_analysis(self):
+        if self.parcel_thread is not None and self.parcel_thread.isRunning():
+            QMessageBox.information(self, '알림', '파셀 분석이 진행 중입니다.')
+            return
+
         # 연속지적도 파일 선택
         cadastral_file, _ = QFileDialog.getOpenFileName(self, '연속지적도 파일 열기', '', 'Shapefile (*.shp)')
         if not cadastral_file:
@@ -197,81 +663,62 @@ class Canvas(QWidget):
         if not ok or not field_name:
             return
 
-        try:
-            # 지오판다스를 사용하여 Shapefile 불러오기
-            cadastral_gdf = gpd.read_file(cadastral_file, encoding='utf-8')
-            boundary_gdf = gpd.read_file(boundary_file, encoding='utf-8')
-
-            # 좌표계 통일
-            cadastral_gdf = cadastral_gdf.to_crs(boundary_gdf.crs)
-
-            # 교차 분석 수행
-            intersection = gpd.overlay(cadastral_gdf, boundary_gdf, how='intersection')
-
-            # 면적 계산
-            intersection['area'] = intersection.geometry.area
+        # 분석은 작업 스레드에서 진행하므로 저장할 엑셀 파일을 먼저 정함
+        save_file, _ = QFileDialog.getSaveFileName(self, '엑셀 파일로 저장', '', 'Excel Files (*.xlsx)')
+        if not save_file:
+            return
 
-            # 보상금액 계산 (면적 × 공시지가)
-            if '공시지가' in intersection.columns:
-                intersection['compensation'] = intersection['area'] * intersection['공시지가']
-            else:
-                QMessageBox.warning(self, '경고', '공시지가 필드가 없습니다.')
-                intersection['compensation'] = 0
-
-            # 통계 산출
-            stats = intersection.groupby(field_name).agg({
-                'area': 'sum',
-                'geometry': 'count',
-                '공시지가': 'first',
-                'compensation': 'sum'
-            }).rename(columns={'geometry': '필지 수', '공시지가': '공시지가', 'area': '면적 합계', 'compensation': '보상금액'})
-
-            # 엑셀로 내보내기
-            save_file, _ = QFileDialog.getSaveFileName(self, '엑셀 파일로 저장', '', 'Excel Files (*.xlsx)')
-            if save_file:
-                self.export_to_excel(stats, intersection, field_name, save_file)
-                QMessageBox.information(self, '완료', '엑셀 파일로 저장되었습니다.')
+        worker = ParcelAnalysisWorker(cadastral_file, boundary_file, field_name, save_file)
+        worker.finished.connect(self.on_parcel_analysis_finished)
+        worker.failed.connect(self.on_parcel_analysis_failed)
+
+        # 분석 중에도 캔버스를 쓸 수 있도록 모달이 아닌 진행 창으로 표시
+        dialog = QProgressDialog('파셀 분석 준비 중...', '취소', 0, len(PARCEL_STAGES), self)
+        dialog.setWindowTitle('파셀 분석')
+        dialog.setWindowModality(Qt.NonModal)
+        dialog.setMinimumDuration(0)
+        dialog.setAutoClose(False)
+        dialog.setAutoReset(False)
+        # 작업 스레드가 run() 안에 있는 동안에도 취소 플래그가 바로 서도록 직접 연결
+        dialog.canceled.connect(worker.cancel, Qt.DirectConnection)
+        worker.progress.connect(lambda done, total: dialog.setValue(done))
+        worker.stage.connect(lambda name: dialog.setLabelText(f'{name}...'))
+        worker.finished.connect(dialog.close)
+        worker.failed.connect(dialog.close)
+        dialog.show()
+
+        self.parcel_dialog = dialog
+        self.parcel_worker = worker
+        self.parcel_thread = start_worker(worker)
+
+    def on_parcel_analysis_finished(self, completed):
+        worker = self.parcel_worker
+        if not completed:
+            log_info(f'파셀 분석을 취소했습니다: {worker.boundary_file}')
+            return
+        log_info(f'파셀 분석 완료: {worker.boundary_file} ({worker.parcel_count}개 필지) -> {worker.save_file}')
+        if not worker.has_price:
+            QMessageBox.warning(self, '경고', '공시지가 필드가 없습니다.')
+        QMessageBox.information(self, '완료', '엑셀 파일로 저장되었습니다.')
 
-        except Exception as e:
-            QMessageBox.critical(self, '오류', f'파셀 분석 중 오류가 발생했습니다:\n{e}')
+    def on_parcel_analysis_failed(self, message):
+        log_error(f'파셀 분석 중 오류 발생: {message}')
+        QMessageBox.critical(self, '오류', f'파셀 분석 중 오류가 발생했습니다:\n{message}')
 
     def export_to_excel(self, stats_df, detail_df, field_name, filename):
-        wb = Workbook()
-        ws_stats = wb.active
-        ws_stats.title = '통계'
-
-        # 통계 시트 작성
-        ws_stats.append([field_name, '면적 합계', '필지 수', '공시지가', '보상금액'])
-        for idx, row in stats_df.iterrows():
-            ws_stats.append([idx, row['면적 합계'], row['필지 수'], row['공시지가'], row['보상금액']])
-
-        # 테이블에 선 표시
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        for row in ws_stats.iter_rows(min_row=1, max_row=ws_stats.max_row, min_col=1, max_col=5):
-            for cell in row:
-                cell.border = thin_border
-
-        # 상세 시트 작성
-        ws_detail = wb.create_sheet('상세')
-        ws_detail.append(detail_df.columns.tolist())
-        for idx, row in detail_df.iterrows():
-            ws_detail.append(row.tolist())
-
-        # 상세 시트 테이블에 선 표시
-        for row in ws_detail.iter_rows(min_row=1, max_row=ws_detail.max_row, min_col=1, max_col=ws_detail.max_column):
-            for cell in row:
-                cell.border = thin_border
-
-        wb.save(filename)
+        parcel_report.export_to_excel(stats_df, detail_df, field_name, filename)
 
     def get_shape_at_position(self, pos):
+        # 공간 인덱스로 클릭 지점 주변 후보만 추려 벡터 판정
+        x, y = pos.x(), pos.y()
+        query = (x - HIT_TOLERANCE, y - HIT_TOLERANCE, x + HIT_TOLERANCE, y + HIT_TOLERANCE)
         for layer in self.layers.values():
-            for shape in layer['shapes']:
-                if shape.contains(pos):
-                    return shape
+            store = layer['shapes']
+            rows = layer['index'].query(query)
+            if len(rows) == 0:
+                continue
+            hits = rows[hit_mask(store.kinds[rows], store.coords[rows], x, y, HIT_TOLERANCE)]
+            if len(hits):
+                return store[int(hits[0])]
         return None
+
@@ -0,0 +1,108 @@
+# ui/dxf_worker.py
+
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from models import dxf_io, geometry_cache
+from network.logger import log_error
+
+class DxfLoadWorker(QObject):
+    # 작업 스레드에서 DXF 를 변환하고 블록/도형/참조 묶음을 GUI 스레드로 넘김
+    # 묶음을 같은 스레드에서 도형 캐시에도 덧붙이고 끝까지 읽으면 마무리 (파일 해시와 배열 쓰기가 GUI 를 멈추지 않도록)
+    progress = pyqtSignal(int, int)  # 처리한 엔티티 수, 전체 수 (모르면 0)
+    batch_ready = pyqtSignal(object)
+    finished = pyqtSignal(bool)  # 끝까지 읽었으면 True, 취소되면 False
+    failed = pyqtSignal(str)
+
+    def __init__(self, filename, streaming=False):
+        super().__init__()
+        self.filename = filename
+        self.streaming = streaming
+        self.cancelled = False
+        self.from_cache = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        writer = None
+        try:
+            cached = geometry_cache.load(self.filename)
+            if cached is not None:
+                # 캐시가 유효하면 변환 없이 메모리 매핑 배열을 한 묶음으로 넘김
+                self.from_cache = True
+                total = sum(len(kinds) for kinds, _ in cached['shapes'].values())
+                self.batch_ready.emit(cached)
+                self.progress.emit(total, total)
+                self.finished.emit(True)
+                return
+            # 묶음이 도착하는 대로 도형 캐시 임시 파일에 덧붙임 (묶음을 모아 두지 않음)
+            writer = self.open_cache()
+            for batch in dxf_io.iter_dxf_batches(self.filename, self.streaming, progress=self.progress.emit):
+                if self.cancelled:
+                    break
+                self.batch_ready.emit(batch)
+                writer = self.cache_step(writer, writer.add, batch) if writer is not None else None
+        except Exception as e:
+            self.discard_cache(writer)
+            self.failed.emit(str(e))
+            return
+        self.finished.emit(not self.cancelled)
+        if self.cancelled:
+            self.discard_cache(writer)
+        elif writer is not None:
+            self.cache_step(writer, writer.finish)
+
+    def open_cache(self):
+        try:
+            return geometry_cache.CacheWriter(self.filename)
+        except Exception as e:
+            log_error(f'도형 캐시 저장 중 오류 발생: {e}')
+            return None
+
+    def cache_step(self, writer, step, *args):
+        # 캐시 쓰기에 실패하면 캐시만 포기하고 불러오기는 계속 (이후 None 반환)
+        try:
+            step(*args)
+            return writer
+        except Exception as e:
+            log_error(f'도형 캐시 저장 중 오류 발생: {e}')
+            writer.discard()
+            return None
+
+    def discard_cache(self, writer):
+        if writer is not None:
+            writer.discard()
+
+class DxfSaveWorker(QObject):
+    # 레이어 저장소 스냅샷을 작업 스레드에서 DXF 로 저장
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, filename, stores, inserts=None, blocks=None):
+        super().__init__()
+        self.filename = filename
+        self.stores = stores
+        self.inserts = inserts
+        self.blocks = blocks
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            completed = dxf_io.save_dxf(self.filename, self.stores, self.progress.emit, lambda: self.cancelled,
+                                        self.inserts, self.blocks)
+            self.finished.emit(completed)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+def start_worker(worker):
+    # 작업 객체를 새 QThread 로 옮겨 실행, 끝나면 스레드 종료
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.failed.connect(thread.quit)
+    thread.start()
+    return thread
@@ -34,7 +34,18 @@ class LayerManager(QWidget):
         self.layout.addWidget(self.delete_layer_button)
         self.setLayout(self.layout)
 
+        self.canvas.layers_changed.connect(self.refresh_layers)
+
+    def refresh_layers(self):
+        # 캔버스의 레이어 구성이 바뀌면 목록 다시 채우기
+        self.layer_list.blockSignals(True)
+        self.layer_list.clear()
+        self.layer_list.addItems(self.canvas.layers.keys())
+        self.layer_list.blockSignals(False)
+
     def layer_selection_changed(self, current, previous):
+        if current is None:
+            return
         layer_name = current.text()
         self.canvas.current_layer = layer_name
         hatch = self.canvas.layers[layer_name].get('hatch', Qt.NoBrush)
@@ -45,16 +56,14 @@ class LayerManager(QWidget):
         layer_name = self.layer_list.currentItem().text()
         hatch_patterns = [Qt.NoBrush, Qt.Dense1Pattern, Qt.Dense2Pattern, Qt.Dense3Pattern]
         self.canvas.layers[layer_name]['hatch'] = hatch_patterns[index]
-        self.canvas.update()
+        self.canvas.mark_layer_dirty(layer_name)
 
     def add_layer(self):
         layer_name, ok = QInputDialog.getText(self, '레이어 추가', '레이어 이름:')
         if ok and layer_name:
-            self.canvas.layers[layer_name] = {'color': Qt.black, 'shapes': [], 'hatch': Qt.NoBrush}
-            self.layer_list.addItem(layer_name)
+            self.canvas.add_layer(layer_name)
 
     def delete_layer(self):
         layer_name = self.layer_list.currentItem().text()
         if layer_name != 'Default':
-            del self.canvas.layers[layer_name]
-            self.layer_list.takeItem(self.layer_list.currentRow())
+            self.canvas.remove_layer(layer_name)
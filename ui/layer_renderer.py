@@ -0,0 +1,178 @@
+# ui/layer_renderer.py
+
+import math
+import numpy as np
+from PyQt5.QtGui import QPen, QPainterPath, QPolygonF, QTransform
+from PyQt5.QtCore import Qt, QLineF, QRectF, QPointF
+from models.geometry_store import KIND_LINE, KIND_CIRCLE, KIND_RECTANGLE, KIND_ARC, rows_bounds
+from models.blocks import MAX_BLOCK_DEPTH
+
+LOD_MIN_ROWS = 10000  # 이보다 작은 레이어는 축소 시에도 그대로 그림
+
+def layer_pen(layer, scale):
+    return QPen(layer['color'], 2 / scale)
+
+def layer_brush(layer):
+    if 'hatch' in layer:
+        return Qt.NoBrush if layer['hatch'] == Qt.NoBrush else Qt.BrushStyle(layer['hatch'])
+    return Qt.NoBrush
+
+def draw_rows_per_shape(painter, layer, rows, scale):
+    # 도형마다 펜/브러시를 설정하고 Shape.draw 를 호출하는 기존 방식
+    store = layer['shapes']
+    for row in rows.tolist():
+        painter.setPen(layer_pen(layer, scale))
+        painter.setBrush(layer_brush(layer))
+        store[row].draw(painter)
+
+def fill_path(kinds, coords):
+    # 원/사각형을 채움 규칙이 같은 경로 하나로 모음
+    path = QPainterPath()
+    path.setFillRule(Qt.WindingFill)
+    for cx, cy, r, _, _ in coords[kinds == KIND_CIRCLE].tolist():
+        path.addEllipse(QRectF(cx - r, cy - r, r * 2, r * 2))
+    for x1, y1, x2, y2, _ in coords[kinds == KIND_RECTANGLE].tolist():
+        path.addRect(QRectF(min(x1, x2), min(y1, y2), abs(x2 - x1), abs(y2 - y1)))
+    return path
+
+def arcs_path(kinds, coords):
+    # 호는 채우지 않는 경로로 모음 (Qt 호 각도는 y 축이 위를 향하므로 부호를 바꿈)
+    path = QPainterPath()
+    for cx, cy, r, start, end in coords[kinds == KIND_ARC].tolist():
+        rect = QRectF(cx - r, cy - r, r * 2, r * 2)
+        sweep = (end - start) % 360 or 360.0
+        path.arcMoveTo(rect, -start)
+        path.arcTo(rect, -start, -sweep)
+    return path
+
+def draw_rows_batched(painter, layer, rows, scale, pen=None, brush=None):
+    # 레이어당 펜/브러시는 한 번만 설정하고, 선은 drawLines 한 번, 원/사각형과 호는 각각 경로 하나로 그림
+    store = layer['shapes']
+    kinds = store.kinds[rows]
+    coords = store.coords[rows]
+    painter.setPen(pen if pen is not None else layer_pen(layer, scale))
+    painter.setBrush(brush if brush is not None else layer_brush(layer))
+
+    lines = coords[kinds == KIND_LINE]
+    if len(lines):
+        painter.drawLines([QLineF(x1, y1, x2, y2) for x1, y1, x2, y2, _ in lines.tolist()])
+
+    if (kinds == KIND_CIRCLE).any() or (kinds == KIND_RECTANGLE).any():
+        painter.drawPath(fill_path(kinds, coords))
+
+    if (kinds == KIND_ARC).any():
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(arcs_path(kinds, coords))
+
+def block_paths(block):
+    # 블록 도형을 선/호 경로와 채움 경로로 한 번만 만들어 두고 모든 참조에서 재사용
+    store = block.shapes
+    if block.paths is None or block.paths[0] != store.version:
+        kinds = store.kinds[:store.count]
+        coords = store.coords[:store.count]
+        stroke = arcs_path(kinds, coords)
+        for x1, y1, x2, y2, _ in coords[kinds == KIND_LINE].tolist():
+            stroke.moveTo(x1, y1)
+            stroke.lineTo(x2, y2)
+        block.paths = (store.version, stroke, fill_path(kinds, coords))
+    return block.paths[1], block.paths[2]
+
+def draw_inserts(painter, inserts, rows, blocks, depth=0):
+    # 참조마다 페인터 변환만 바꿔 공유 블록 경로를 그림 (중첩 참조는 재귀)
+    base = painter.transform()
+    brush = painter.brush()
+    for row in rows:
+        block = blocks.get(inserts.block_name(row))
+        if block is None:
+            continue
+        x, y, sx, sy, rotation = inserts.transforms[row].tolist()
+        local = QTransform().translate(x, y).rotate(rotation).scale(sx, sy).translate(-block.base[0], -block.base[1])
+        painter.setTransform(local * base)
+        stroke, fill = block_paths(block)
+        if not fill.isEmpty():
+            painter.setBrush(brush)
+            painter.drawPath(fill)
+        if not stroke.isEmpty():
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(stroke)
+        if len(block.inserts) and depth < MAX_BLOCK_DEPTH:
+            painter.setBrush(brush)
+            draw_inserts(painter, block.inserts, range(len(block.inserts)), blocks, depth + 1)
+    painter.setTransform(base)
+    painter.setBrush(brush)
+
+def draw_layer_inserts(painter, layer, rows, blocks, scale):
+    # 블록 참조 그리기: 참조 배율과 무관하게 선 두께가 일정하도록 코스메틱 펜 사용
+    # 화면에서 2픽셀보다 작은 참조는 중심점 하나로 그림, 그린 참조 수와 점 수를 반환
+    bounds = layer['insert_index'].bounds[rows]
+    tiny = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1]) * scale < 2
+    pen = QPen(layer['color'], 2)
+    pen.setCosmetic(True)
+    painter.setPen(pen)
+    painter.setBrush(layer_brush(layer))
+    drawn = rows[~tiny]
+    draw_inserts(painter, layer['inserts'], drawn.tolist(), blocks)
+    points = (bounds[tiny, :2] + bounds[tiny, 2:]) / 2
+    if len(points):
+        painter.setPen(QPen(layer['color'], 0))
+        painter.drawPoints(points_polygon(points))
+    return len(drawn), len(points)
+
+def lod_level(scale):
+    # 화면 1~2 픽셀에 해당하는 장면 단위 셀 크기의 지수 (확대 상태면 None)
+    if scale >= 1:
+        return None
+    return math.ceil(math.log2(1 / scale))
+
+def lod_summary(layer, level):
+    # 셀보다 작은 도형은 셀 중심점 하나로 합치고, 나머지 행 번호만 남긴 요약을 확대 수준별로 캐시
+    store = layer['shapes']
+    cache = layer.setdefault('lod', {})
+    cached = cache.get(level)
+    if cached is not None and cached[0] == store.version:
+        return cached[1], cached[2], cached[3]
+    cell = 2.0 ** level
+    bounds = rows_bounds(store.kinds[:store.count], store.coords[:store.count])
+    extent = np.maximum(bounds[:, 2] - bounds[:, 0], bounds[:, 3] - bounds[:, 1])
+    tiny = extent < cell
+    centers = (bounds[tiny, :2] + bounds[tiny, 2:]) / 2
+    cells = np.floor(centers / cell).astype(np.int64)
+    origin = cells.min(axis=0) if len(cells) else np.zeros(2, dtype=np.int64)
+    cells -= origin
+    width = int(cells[:, 0].max()) + 1 if len(cells) else 1
+    keys = np.unique(cells[:, 1] * width + cells[:, 0])
+    points = (np.column_stack((keys % width, keys // width)) + origin + 0.5) * cell
+    large_rows = np.flatnonzero(~tiny)
+    large_bounds = bounds[large_rows]
+    cache[level] = (store.version, points, large_rows, large_bounds)
+    return points, large_rows, large_bounds
+
+def points_polygon(points):
+    # (N, 2) 배열을 QPolygonF 메모리에 직접 복사
+    polygon = QPolygonF()
+    polygon.fill(QPointF(), len(points))
+    buffer = polygon.data()
+    buffer.setsize(len(points) * 2 * 8)
+    np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)[:] = points
+    return polygon
+
+def use_lod(layer, scale):
+    return lod_level(scale) is not None and len(layer['shapes']) >= LOD_MIN_ROWS
+
+def draw_layer_lod(painter, layer, view, scale):
+    # 축소 시 작은 도형은 점으로, 큰 도형만 일괄 그리기로 처리 (화면 픽셀 수에 비례하는 비용)
+    # 그린 도형 수와 점 수를 반환
+    points, large_rows, large_bounds = lod_summary(layer, lod_level(scale))
+    min_x, min_y, max_x, max_y = view
+    visible = ((large_bounds[:, 0] <= max_x) & (large_bounds[:, 2] >= min_x)
+               & (large_bounds[:, 1] <= max_y) & (large_bounds[:, 3] >= min_y))
+    rows = large_rows[visible]
+    if len(rows):
+        draw_rows_batched(painter, layer, rows, scale)
+    inside = ((points[:, 0] >= min_x) & (points[:, 0] <= max_x)
+              & (points[:, 1] >= min_y) & (points[:, 1] <= max_y))
+    points = points[inside]
+    if len(points):
+        painter.setPen(QPen(layer['color'], 0))
+        painter.drawPoints(points_polygon(points))
+    return len(rows), len(points)
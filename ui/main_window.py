@@ -1,6 +1,6 @@
 # ui/main_window.py
 
-from PyQt5.QtWidgets import QMainWindow, QAction, QFileDialog, QToolBar, QStatusBar, QDockWidget
+from PyQt5.QtWidgets import QMainWindow, QAction, QActionGroup, QFileDialog, QToolBar, QStatusBar, QDockWidget, QProgressDialog, QMessageBox
 from PyQt5.QtGui import QIcon
 from PyQt5.QtCore import Qt
 from ui.canvas import Canvas
@@ -71,6 +71,26 @@ class MainWindow(QMainWindow):
         self.view_3d_action = QAction('3D 보기', self)
         self.view_3d_action.triggered.connect(self.open_3d_viewer)
 
+        self.profiler_action = QAction('렌더링 프로파일러', self)
+        self.profiler_action.setCheckable(True)
+        self.profiler_action.toggled.connect(self.canvas.set_profiling)
+
+        self.export_profile_action = QAction('프로파일 기록 내보내기', self)
+        self.export_profile_action.triggered.connect(self.export_profile)
+
+        # 선택 모드: 끌기 방향에 따른 윈도우/걸침 선택과 올가미 선택 중 하나
+        self.select_mode_group = QActionGroup(self)
+        self.rect_select_action = QAction('윈도우/걸침 선택', self)
+        self.rect_select_action.setCheckable(True)
+        self.rect_select_action.setChecked(True)
+        self.rect_select_action.triggered.connect(lambda: self.canvas.set_mode('select'))
+        self.select_mode_group.addAction(self.rect_select_action)
+
+        self.lasso_select_action = QAction('올가미 선택', self)
+        self.lasso_select_action.setCheckable(True)
+        self.lasso_select_action.triggered.connect(lambda: self.canvas.set_mode('lasso'))
+        self.select_mode_group.addAction(self.lasso_select_action)
+
     def create_menus(self):
         menubar = self.menuBar()
 
@@ -82,11 +102,17 @@ class MainWindow(QMainWindow):
         file_menu.addAction(self.export_shp_action)
         file_menu.addAction(self.open_dxf_viewer_action)
 
+        select_menu = menubar.addMenu('선택')
+        select_menu.addAction(self.rect_select_action)
+        select_menu.addAction(self.lasso_select_action)
+
         analysis_menu = menubar.addMenu('분석')
         analysis_menu.addAction(self.parcel_analysis_action)
 
         view_menu = menubar.addMenu('보기')
         view_menu.addAction(self.view_3d_action)
+        view_menu.addAction(self.profiler_action)
+        view_menu.addAction(self.export_profile_action)
 
     def open_dxf_file(self):
         fname, _ = QFileDialog.getOpenFileName(self, 'DXF 파일 열기', '', 'DXF Files (*.dxf)')
@@ -115,6 +141,9 @@ class MainWindow(QMainWindow):
         self.toolbar.addAction(self.new_action)
         self.toolbar.addAction(self.open_action)
         self.toolbar.addAction(self.save_action)
+        self.toolbar.addSeparator()
+        self.toolbar.addAction(self.rect_select_action)
+        self.toolbar.addAction(self.lasso_select_action)
         # 기타 도구 추가...
 
     def create_statusbar(self):
@@ -129,14 +158,45 @@ class MainWindow(QMainWindow):
         self.canvas.new_file()
 
     def open_file(self):
+        if self.canvas.is_busy():
+            QMessageBox.information(self, '알림', '다른 파일 작업이 진행 중입니다.')
+            return
         fname, _ = QFileDialog.getOpenFileName(self, '파일 열기', '', 'DXF Files (*.dxf)')
         if fname:
-            self.canvas.open_dxf(fname)
+            worker = self.canvas.start_open_dxf(fname)
+            self.show_progress('DXF 파일을 불러오는 중...', worker)
 
     def save_file(self):
+        if self.canvas.is_busy():
+            QMessageBox.information(self, '알림', '다른 파일 작업이 진행 중입니다.')
+            return
         fname, _ = QFileDialog.getSaveFileName(self, '파일 저장', '', 'DXF Files (*.dxf)')
         if fname:
-            self.canvas.save_dxf(fname)
+            worker = self.canvas.start_save_dxf(fname)
+            self.show_progress('DXF 파일로 저장하는 중...', worker)
+
+    def show_progress(self, label, worker):
+        # 작업 스레드의 진행률을 표시하고 취소 버튼을 작업 취소에 연결
+        dialog = QProgressDialog(label, '취소', 0, 0, self)
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        # 작업 객체는 이미 작업 스레드로 옮겨져 있어 대기열 연결이면 run() 이 끝난 뒤에야 호출되므로 바로 호출
+        dialog.canceled.connect(worker.cancel, Qt.DirectConnection)
+
+        def on_progress(done, total):
+            dialog.setMaximum(total)
+            dialog.setValue(done if total else 0)
+            dialog.setLabelText(f'{label} ({done:,} / {total:,})' if total else f'{label} ({done:,})')
+
+        def on_failed(message):
+            dialog.close()
+            QMessageBox.critical(self, '오류', f'DXF 파일 처리 중 오류가 발생했습니다:\n{message}')
+
+        worker.progress.connect(on_progress)
+        worker.finished.connect(dialog.close)
+        worker.failed.connect(on_failed)
+        self.progress_dialog = dialog
+        dialog.show()
 
     def open_ifc_file(self):
         fname, _ = QFileDialog.getOpenFileName(self, 'IFC 파일 열기', '', 'IFC Files (*.ifc)')
@@ -151,6 +211,11 @@ class MainWindow(QMainWindow):
     def perform_parcel_analysis(self):
         self.canvas.perform_parcel_analysis()
 
+    def export_profile(self):
+        fname, _ = QFileDialog.getSaveFileName(self, '프로파일 기록 내보내기', '', 'CSV Files (*.csv);;JSON Files (*.json)')
+        if fname:
+            self.canvas.profiler.export(fname)
+
     def open_3d_viewer(self):
-        viewer = ThreeDViewer(self.canvas.shapes)
+        viewer = ThreeDViewer(list(self.canvas.all_shapes()))
         viewer.show()
@@ -0,0 +1,73 @@
+# ui/parcel_worker.py
+
+import geopandas as gpd
+from PyQt5.QtCore import QObject, pyqtSignal
+from models.parcel_analysis import CadastralLayer, overlay_parcels, add_compensation, summarize
+from models import parcel_report
+
+# 분석 단계 (불러오기, 좌표계 변환, 교차 분석, 집계, 내보내기)
+STAGES = ['구획선 불러오기', '지적도 좌표계 변환', '교차 분석', '통계 산출', '엑셀 파일로 저장']
+
+class ParcelAnalysisWorker(QObject):
+    # 작업 스레드에서 필지 교차 분석을 단계별로 실행, 단계 사이와 교차 분석 묶음 사이에서 취소 확인
+    progress = pyqtSignal(int, int)  # 끝난 단계 수, 전체 단계 수
+    stage = pyqtSignal(str)  # 시작한 단계 이름
+    finished = pyqtSignal(bool)  # 끝까지 실행했으면 True, 취소되면 False
+    failed = pyqtSignal(str)
+
+    def __init__(self, cadastral_file, boundary_file, field_name, save_file):
+        super().__init__()
+        self.cadastral_file = cadastral_file
+        self.boundary_file = boundary_file
+        self.field_name = field_name
+        self.save_file = save_file
+        self.cancelled = False
+        self.has_price = True
+        self.parcel_count = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def begin(self, index):
+        # 취소되었으면 False, 아니면 단계 시작을 알림
+        if self.cancelled:
+            return False
+        self.progress.emit(index, len(STAGES))
+        self.stage.emit(STAGES[index])
+        return True
+
+    def run(self):
+        try:
+            self.finished.emit(self.analyze())
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def analyze(self):
+        # 단계를 차례로 실행, 취소되면 False (엑셀 파일은 마지막 단계에서만 씀)
+        if not self.begin(0):
+            return False
+        boundary_gdf = gpd.read_file(self.boundary_file, encoding='utf-8')
+        layer = CadastralLayer(self.cadastral_file)
+
+        # 변환된 지적도 캐시가 없으면 이 단계에서 만들고, 있으면 구획선 범위의 필지만 읽음
+        if not self.begin(1):
+            return False
+        parcels = layer.parcels_for(boundary_gdf)
+
+        if not self.begin(2):
+            return False
+        intersection = overlay_parcels(parcels, boundary_gdf, is_cancelled=lambda: self.cancelled)
+        if intersection is None:
+            return False
+
+        if not self.begin(3):
+            return False
+        self.has_price = add_compensation(intersection)
+        stats = summarize(intersection, self.field_name)
+        self.parcel_count = len(intersection)
+
+        if not self.begin(4):
+            return False
+        parcel_report.export_to_excel(stats, intersection, self.field_name, self.save_file)
+        self.progress.emit(len(STAGES), len(STAGES))
+        return True
@@ -0,0 +1,239 @@
+# ui/pdf_export.py
+# DXF 도면 일괄 PDF 출력 (화면 없이 오프스크린 Qt, 작업 프로세스 병렬 처리)
+# 실행: python -m ui.pdf_export drawings/ --output outputs --workers 8
+
+import argparse
+import fnmatch
+import multiprocessing
+import os
+import sys
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import ezdxf
+from ezdxf.addons.drawing import Frontend, RenderContext
+from ezdxf.addons.drawing.pyqt import PyQtBackend, CorrespondingDXFEntity, CorrespondingDXFParentStack
+from PyQt5 import QtWidgets, QtCore, QtGui, QtPrintSupport
+from models.output_paths import output_paths
+
+# SavePdfs 창의 기본값과 같은 출력 설정
+DEFAULT_SETTINGS = {
+    'translate': (0.0, 46.65),
+    'scale': (1.0, -1.0),
+    'rotate': 0.0,
+    'thin_width': 0.4,
+    'thick_width': 1.2,
+    'layout': 'Model',
+}
+
+NO_BRUSH = QtGui.QBrush(QtCore.Qt.NoBrush)
+
+def print_pens(settings):
+    brush = QtGui.QBrush(QtGui.QColor('#000000'))
+    return {
+        'text': QtGui.QPen(brush, 0),
+        'thin': QtGui.QPen(brush, settings['thin_width']),
+        'thick': QtGui.QPen(brush, settings['thick_width']),
+        'brush': brush,
+    }
+
+def pen_rule(dxf_entity, dxf_parent_stack):
+    # 문자는 'text', 치수 안의 선과 CENTER 선종류 선은 'thin', 나머지는 'thick'
+    if type(dxf_entity) is ezdxf.entities.mtext.MText or type(dxf_entity) is ezdxf.entities.text.Text:
+        return 'text'
+    if dxf_parent_stack is not None:
+        if ezdxf.entities.dimension.Dimension in [type(p) for p in dxf_parent_stack]:
+            return 'thin'
+    if type(dxf_entity) is ezdxf.entities.line.Line:
+        if dxf_entity.dxf.linetype == 'CENTER':
+            return 'thin'
+    return 'thick'
+
+def print_style(item, pens):
+    # 항목의 출력용 (펜, 브러시): 모두 검은색, 문자와 점만 채우고 나머지는 윤곽선만
+    # 펜/브러시가 없는 항목(그룹 등)은 None
+    if not isinstance(item, (QtWidgets.QAbstractGraphicsShapeItem, QtWidgets.QGraphicsLineItem)):
+        return None
+    rule = pen_rule(item.data(CorrespondingDXFEntity), item.data(CorrespondingDXFParentStack))
+    outline = isinstance(item, (QtWidgets.QGraphicsPathItem, QtWidgets.QGraphicsPolygonItem, QtWidgets.QGraphicsLineItem))
+    if rule == 'text' or not outline:
+        # 점 항목은 브러시로만 그려지므로 채움 유지
+        return pens[rule], pens['brush']
+    return pens[rule], NO_BRUSH
+
+def apply_print_styles(scene, settings):
+    # 씬 항목의 펜/브러시를 출력 규칙으로 바꾸고 원래 값 목록을 반환 (restore_styles 로 되돌림)
+    # 꺼진 레이어 항목은 어차피 그려지지 않으므로 건드리지 않음
+    pens = print_pens(settings)
+    # 화면용 배경색은 출력하지 않음 (출력 규칙과 같이 흰 종이에 검은 선)
+    saved = [(scene, scene.backgroundBrush(), None)]
+    scene.setBackgroundBrush(NO_BRUSH)
+    index_method = scene.itemIndexMethod()
+    # 펜 굵기가 바뀔 때마다 BSP 색인이 갱신되지 않도록 잠시 색인을 끔
+    scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+    try:
+        for item in scene.items():
+            if not item.isVisible():
+                continue
+            if isinstance(item, QtWidgets.QGraphicsTextItem):
+                saved.append((item, item.defaultTextColor(), None))
+                item.setDefaultTextColor(pens['brush'].color())
+                continue
+            style = print_style(item, pens)
+            if style is None:
+                continue
+            if isinstance(item, QtWidgets.QAbstractGraphicsShapeItem):
+                saved.append((item, item.pen(), item.brush()))
+                item.setBrush(style[1])
+            else:
+                saved.append((item, item.pen(), None))
+            item.setPen(style[0])
+    finally:
+        scene.setItemIndexMethod(index_method)
+    return saved
+
+def restore_styles(scene, saved):
+    index_method = scene.itemIndexMethod()
+    scene.setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+    try:
+        for item, pen, brush in saved:
+            if item is scene:
+                scene.setBackgroundBrush(pen)
+                continue
+            if isinstance(item, QtWidgets.QGraphicsTextItem):
+                item.setDefaultTextColor(pen)
+                continue
+            item.setPen(pen)
+            if brush is not None:
+                item.setBrush(brush)
+    finally:
+        scene.setItemIndexMethod(index_method)
+
+@contextmanager
+def print_styles(scene, settings):
+    # 원본 씬을 복사하지 않고 출력하는 동안만 출력 규칙을 적용
+    saved = apply_print_styles(scene, settings)
+    try:
+        yield scene
+    finally:
+        restore_styles(scene, saved)
+
+def write_pdf(scene, filename, settings, render=None):
+    # 씬 크기(mm)의 페이지에 translate/scale/rotate 설정을 적용해 출력
+    # render(painter) 를 넘기면 scene.render 대신 사용
+    width, height = int(scene.width()), int(scene.height())
+    page_size = QtGui.QPageSize(QtCore.QSizeF(width, height), QtGui.QPageSize.Unit.Millimeter)
+    printer = QtPrintSupport.QPrinter(QtPrintSupport.QPrinter.HighResolution)
+    printer.setPageSize(page_size)
+    printer.setOutputFormat(QtPrintSupport.QPrinter.PdfFormat)
+    printer.setOutputFileName(str(filename))
+    painter = QtGui.QPainter(printer)
+    painter.translate(width * settings['translate'][0], height * settings['translate'][1])
+    painter.scale(settings['scale'][0], settings['scale'][1])
+    painter.rotate(settings['rotate'])
+    if render is None:
+        scene.render(painter)
+    else:
+        render(painter)
+    painter.end()
+
+def write_styled_pdf(scene, filename, settings):
+    # 화면에 쓰는 씬을 그대로 출력 규칙으로 그리고 원래 모양으로 되돌림
+    with print_styles(scene, settings):
+        write_pdf(scene, filename, settings)
+
+def render_layout(doc, layout_name):
+    scene = QtWidgets.QGraphicsScene()
+    backend = PyQtBackend()
+    backend.set_scene(scene)
+    layout = doc.layout(layout_name)
+    context = RenderContext(doc)
+    context.set_current_layout(layout)
+    try:
+        Frontend(context, backend).draw_layout(layout)
+    finally:
+        backend.finalize()
+    return scene
+
+def init_worker():
+    # 작업 프로세스마다 화면 없는 QApplication 을 하나 만듦
+    os.environ['QT_QPA_PLATFORM'] = 'offscreen'
+    global _app
+    _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+def export_file(path, output, settings):
+    # 도면 하나를 PDF 로 출력하고 (원본 경로, 출력 경로, 오류 메시지) 반환
+    try:
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        doc = ezdxf.readfile(str(path))
+        scene = render_layout(doc, settings['layout'])
+        apply_print_styles(scene, settings)
+        write_pdf(scene, output, settings)
+        return str(path), str(output), ''
+    except Exception as e:
+        return str(path), str(output), str(e)
+
+def find_drawings(inputs, pattern='*.dxf'):
+    # 디렉터리는 패턴에 맞는 파일을 (대소문자 무시) 모으고, 파일은 그대로 사용
+    paths = []
+    for name in inputs:
+        path = Path(name)
+        if path.is_dir():
+            paths += sorted(p for p in path.iterdir() if p.is_file() and fnmatch.fnmatch(p.name.lower(), pattern.lower()))
+        else:
+            paths.append(path)
+    return paths
+
+def export_pdfs(paths, output_dir, settings=None, workers=None, progress=None):
+    # 도면들을 작업 프로세스에서 병렬로 출력, 끝나는 순서대로 progress(완료 수, 전체 수, 결과) 호출
+    settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker) as pool:
+        # 이름이 같은 도면끼리 덮어쓰지 않도록 출력 경로를 미리 정해 넘김
+        futures = [pool.submit(export_file, str(path), str(output), settings)
+                   for path, output in zip(paths, output_paths(paths, output_dir, '.pdf'))]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            if progress is not None:
+                progress(done, len(futures), result)
+    return results
+
+def main(argv=None):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    parser = argparse.ArgumentParser(description='DXF 도면 일괄 PDF 출력')
+    parser.add_argument('inputs', nargs='+', help='DXF 파일 또는 디렉터리')
+    parser.add_argument('--output', default='outputs')
+    parser.add_argument('--pattern', default='*.dxf')
+    parser.add_argument('--workers', type=int, default=None, help='작업 프로세스 수 (기본: CPU 수)')
+    parser.add_argument('--layout', default=DEFAULT_SETTINGS['layout'])
+    parser.add_argument('--translate', type=float, nargs=2, default=DEFAULT_SETTINGS['translate'], metavar=('X', 'Y'))
+    parser.add_argument('--scale', type=float, nargs=2, default=DEFAULT_SETTINGS['scale'], metavar=('X', 'Y'))
+    parser.add_argument('--rotate', type=float, default=DEFAULT_SETTINGS['rotate'])
+    parser.add_argument('--thin-width', type=float, default=DEFAULT_SETTINGS['thin_width'])
+    parser.add_argument('--thick-width', type=float, default=DEFAULT_SETTINGS['thick_width'])
+    args = parser.parse_args(argv)
+
+    settings = {'translate': tuple(args.translate), 'scale': tuple(args.scale), 'rotate': args.rotate,
+                'thin_width': args.thin_width, 'thick_width': args.thick_width, 'layout': args.layout}
+    paths = find_drawings(args.inputs, args.pattern)
+    if not paths:
+        print('출력할 도면이 없습니다.')
+        return 1
+
+    def progress(done, total, result):
+        path, output, error = result
+        print(f'[{done}/{total}] {path} -> {output}' + (f'  실패: {error}' if error else ''))
+
+    start = time.perf_counter()
+    results = export_pdfs(paths, args.output, settings, args.workers, progress)
+    failed = sum(1 for _, _, error in results if error)
+    print(f'{len(results) - failed}개 출력, {failed}개 실패 ({time.perf_counter() - start:.1f} s)')
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# ui/profiler.py
+
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from PyQt5.QtGui import QColor, QFont
+from PyQt5.QtCore import Qt, QRectF
+
+class RenderProfiler:
+    # 캔버스 렌더링/상호작용 계측 (켜져 있을 때만 기록)
+    # frames: paintEvent 한 번당 측정값, events: 히트 테스트, DXF 불러오기 등 개별 작업 소요 시간
+    def __init__(self, max_records=2000):
+        self.enabled = False
+        self.frames = deque(maxlen=max_records)
+        self.events = deque(maxlen=max_records)
+        self.current = None
+
+    def clear(self):
+        self.frames.clear()
+        self.events.clear()
+        self.current = None
+
+    def begin_frame(self):
+        if self.enabled:
+            self.current = {'timestamp': time.time(), 'start': time.perf_counter()}
+
+    def end_frame(self):
+        if self.current is None:
+            return
+        frame = self.current
+        frame['paint_ms'] = (time.perf_counter() - frame.pop('start')) * 1000
+        self.frames.append(frame)
+        self.current = None
+
+    @contextmanager
+    def measure(self, name):
+        # 현재 프레임 안의 구간 시간 누적 (예: grid_ms, scene_ms)
+        if self.current is None:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = name + '_ms'
+            self.current[key] = self.current.get(key, 0.0) + (time.perf_counter() - start) * 1000
+
+    def count(self, name, value):
+        if self.current is not None:
+            self.current[name] = self.current.get(name, 0) + value
+
+    @contextmanager
+    def event(self, name, **details):
+        start = self.start_event()
+        try:
+            yield
+        finally:
+            self.end_event(name, start, **details)
+
+    def start_event(self):
+        # 시작과 끝이 다른 호출에서 일어나는 작업(백그라운드 불러오기 등)용, 꺼져 있으면 None
+        return time.perf_counter() if self.enabled else None
+
+    def end_event(self, name, start, **details):
+        if start is None:
+            return
+        record = {'timestamp': time.time(), 'name': name, 'ms': (time.perf_counter() - start) * 1000}
+        record.update(details)
+        self.events.append(record)
+
+    def last_event(self, name):
+        for record in reversed(self.events):
+            if record['name'] == name:
+                return record
+        return None
+
+    def overlay_lines(self):
+        lines = []
+        if self.frames:
+            frame = self.frames[-1]
+            recent = list(self.frames)[-30:]
+            average = sum(f['paint_ms'] for f in recent) / len(recent)
+            lines.append(f'paint: {frame["paint_ms"]:.1f} ms (최근 {len(recent)}프레임 평균 {average:.1f} ms)')
+            # 장면 캐시를 그대로 쓴 프레임은 건너뛰고 마지막으로 장면을 다시 그린 프레임 기준
+            scene = next((f for f in reversed(self.frames) if 'scene_ms' in f), None)
+            if scene is not None:
+                lines.append(f'scene: {scene["scene_ms"]:.1f} ms  grid: {scene.get("grid_ms", 0.0):.1f} ms')
+                lines.append(f'drawn: {scene.get("shapes_drawn", 0)}  culled: {scene.get("shapes_culled", 0)}  '
+                             f'inserts: {scene.get("inserts_drawn", 0)}  lod points: {scene.get("lod_points", 0)}  '
+                             f'layers: {scene.get("layers_rendered", 0)}')
+        for name in ('hit_test', 'selection', 'dxf_load'):
+            record = self.last_event(name)
+            if record is not None:
+                lines.append(f'{name}: {record["ms"]:.1f} ms')
+        return lines
+
+    def draw_overlay(self, painter):
+        lines = self.overlay_lines()
+        if not lines:
+            return
+        painter.save()
+        painter.resetTransform()
+        font = QFont('monospace', 9)
+        painter.setFont(font)
+        line_height = painter.fontMetrics().height()
+        width = max(painter.fontMetrics().width(line) for line in lines) + 12
+        rect = QRectF(8, 8, width, line_height * len(lines) + 8)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 160))
+        painter.drawRect(rect)
+        painter.setPen(Qt.white)
+        for i, line in enumerate(lines):
+            painter.drawText(QRectF(14, 12 + i * line_height, width, line_height), Qt.AlignLeft, line)
+        painter.restore()
+
+    def records(self):
+        rows = [dict(frame, type='frame') for frame in self.frames]
+        rows += [dict(record, type='event') for record in self.events]
+        rows.sort(key=lambda row: row['timestamp'])
+        return rows
+
+    def export_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'frames': list(self.frames), 'events': list(self.events)}, f, ensure_ascii=False, indent=2)
+
+    def export_csv(self, filename):
+        rows = self.records()
+        fields = ['type', 'timestamp', 'name', 'ms', 'paint_ms']
+        for row in rows:
+            for key in row:
+                if key not in fields:
+                    fields.append(key)
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def export(self, filename):
+        if filename.lower().endswith('.json'):
+            self.export_json(filename)
+        else:
+            self.export_csv(filename)